@@ -1,8 +1,32 @@
 """
 Rule-based explanation builders for fraud analysis (fallback when LLM is unavailable).
 """
+from bisect import bisect_right
 from typing import Dict, Any
 
+# Banking score bands (30/60/85, as get_risk_level) -> closing sentence
+_BANKING_SCORE_THRESHOLDS = (30, 60, 85)
+_BANKING_SCORE_CONTEXT = (
+    " Mitigating factors currently outweigh most red flags.",
+    " Combined signals indicate MEDIUM risk — monitor closely.",
+    " Combined signals indicate HIGH risk.",
+    " These indicators suggest potential fraudulent activity requiring further investigation.",
+)
+_BANKING_LEGITIMATE = (
+    "Transaction appears legitimate with standard patterns. This analysis evaluated transaction amount, "
+    "account age, geographic location, device fingerprint, transaction timing, and KYC verification status."
+)
+_MEDICAL_CONTEXT = " These indicators suggest potential billing fraud, upcoding, or unnecessary procedures."
+_MEDICAL_LEGITIMATE = (
+    "Claim follows standard medical billing patterns. This analysis evaluated claim amount, procedure count, "
+    "provider history, diagnosis-procedure compatibility, and billing frequency."
+)
+_ECOMMERCE_LEGITIMATE = (
+    "Listing appears legitimate with typical marketplace patterns. This analysis evaluated seller account "
+    "history, pricing consistency, customer feedback, and shipping transparency."
+)
+_NEGATIVE_REVIEW_KEYWORDS = ("negative", "bad", "poor", "terrible", "scam", "fake", "fraud")
+
 
 def explain_banking(data: Dict[str, Any], score: float) -> str:
     """Build explanation from the fields the banking form actually sends (plus legacy aliases)."""
@@ -63,21 +87,12 @@ def explain_banking(data: Dict[str, Any], score: float) -> str:
         factors.append("receiver is a burn/null address")
 
     if factors:
-        base = "Red flags detected: " + ", ".join(factors) + "."
-        if score >= 85:
-            context = " These indicators suggest potential fraudulent activity requiring further investigation."
-        elif score >= 60:
-            context = " Combined signals indicate HIGH risk."
-        elif score >= 30:
-            context = " Combined signals indicate MEDIUM risk — monitor closely."
-        else:
-            context = " Mitigating factors currently outweigh most red flags."
-        return base + context
+        # NaN falls through every band check to the lowest one (bisect would pick the highest)
+        band = 0 if score != score else bisect_right(_BANKING_SCORE_THRESHOLDS, score)
+        context = _BANKING_SCORE_CONTEXT[band]
+        return "Red flags detected: " + ", ".join(factors) + "." + context
 
-    return (
-        "Transaction appears legitimate with standard patterns. This analysis evaluated transaction amount, "
-        "account age, geographic location, device fingerprint, transaction timing, and KYC verification status."
-    )
+    return _BANKING_LEGITIMATE
 
 
 def explain_medical(data: Dict[str, Any], score: float) -> str:
@@ -100,14 +115,9 @@ def explain_medical(data: Dict[str, Any], score: float) -> str:
         factors.append("provider has previous fraud flags")
 
     if factors:
-        base = "Suspicious indicators: " + ", ".join(factors) + "."
-        context = " These indicators suggest potential billing fraud, upcoding, or unnecessary procedures."
-        return base + context
+        return "Suspicious indicators: " + ", ".join(factors) + "." + _MEDICAL_CONTEXT
 
-    return (
-        "Claim follows standard medical billing patterns. This analysis evaluated claim amount, procedure count, "
-        "provider history, diagnosis-procedure compatibility, and billing frequency."
-    )
+    return _MEDICAL_LEGITIMATE
 
 
 def explain_ecommerce(data: Dict[str, Any], score: float) -> str:
@@ -138,10 +148,11 @@ def explain_ecommerce(data: Dict[str, Any], score: float) -> str:
             factors.append("no customer reviews")
             details.append("Lack of customer reviews prevents verification of seller reliability.")
         else:
-            negative_keywords = ["negative", "bad", "poor", "terrible", "scam", "fake", "fraud"]
-            negative_count = sum(
-                1 for r in reviews if any(kw in str(r).lower() for kw in negative_keywords)
-            )
+            negative_count = 0
+            for r in reviews:
+                text = str(r).lower()
+                if any(kw in text for kw in _NEGATIVE_REVIEW_KEYWORDS):
+                    negative_count += 1
             if negative_count > 0:
                 factors.append(f"{negative_count} negative review(s)")
                 details.append("Negative feedback indicates potential quality issues or fraudulent behavior.")
@@ -157,10 +168,7 @@ def explain_ecommerce(data: Dict[str, Any], score: float) -> str:
             base += " " + " ".join(details)
         return base
 
-    return (
-        "Listing appears legitimate with typical marketplace patterns. This analysis evaluated seller account "
-        "history, pricing consistency, customer feedback, and shipping transparency."
-    )
+    return _ECOMMERCE_LEGITIMATE
 
 
 def explain_supply_chain(data: Dict[str, Any], score: float) -> str:
@@ -189,16 +197,18 @@ def explain_supply_chain(data: Dict[str, Any], score: float) -> str:
     return "Supplier and order profile appear legitimate."
 
 
+_EXPLAINERS = {
+    "banking": explain_banking,
+    "medical": explain_medical,
+    "ecommerce": explain_ecommerce,
+    "supply_chain": explain_supply_chain,
+}
+
+
 def build_rule_based_explanation(
     sector: str, data: Dict[str, Any], fraud_score: float, risk_level: str, model: str
 ) -> str:
     """Generate rule-based explanation for a sector."""
-    explainers = {
-        "banking": explain_banking,
-        "medical": explain_medical,
-        "ecommerce": explain_ecommerce,
-        "supply_chain": explain_supply_chain,
-    }
-    explain_fn = explainers.get(sector, lambda d, s: "Analysis complete.")
-    base = explain_fn(data, fraud_score)
+    explain_fn = _EXPLAINERS.get(sector)
+    base = explain_fn(data, fraud_score) if explain_fn else "Analysis complete."
     return f"{model} analysis identifies {risk_level} risk. " + base
@@ -3,16 +3,60 @@ Pinecone-powered RAG engine for fraud pattern retrieval.
 Uses llm.embeddings for generation and retrieval.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pinecone import Pinecone
-from typing import Dict, List, Any
+from typing import AbstractSet, Dict, Iterable, List, Any, Optional
+import hashlib
 import json
 import os
 import logging
+import random
+import time
 
-from app.llm.embeddings import EmbeddingGenerator, query_similar_patterns, DEFAULT_DIMENSIONS
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from app.llm.embeddings import (
+    DEFAULT_DIMENSIONS,
+    HF_EMBEDDING_MODEL,
+    DiskEmbeddingCache,
+    EmbeddingGenerator,
+    query_similar_patterns,
+)
 
 logger = logging.getLogger(__name__)
 
+# Vectors per Pinecone upsert request, and how many requests may be in flight
+# at once (upsert is network-bound; the client's HTTP pool is thread-safe).
+UPSERT_BATCH_SIZE = 100
+UPSERT_CONCURRENCY = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", "8"))
+# IDs per fetch when probing for existing vectors (fetch returns full values)
+FETCH_BATCH_SIZE = 100
+# IDs per delete request (Pinecone accepts at most 1000)
+DELETE_BATCH_SIZE = 1000
+
+# Transient upsert failures back off exponentially (with jitter) and retry the
+# batch as two halves, so a throttled batch shrinks instead of resending whole.
+UPSERT_MAX_RETRIES = 4
+_UPSERT_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_UPSERT_BACKOFF_SECONDS = 0.5
+_UPSERT_MAX_BACKOFF_SECONDS = 8.0
+
+
+def _upsert_error_status(exc: Exception) -> Optional[int]:
+    """HTTP status of a Pinecone error (status_code on current clients, status on older ones)."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def _dumps_indicators(indicators: List[str]) -> str:
+    """Encode indicators metadata as the JSON string the retriever decodes (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(indicators).decode("utf-8")
+    return json.dumps(indicators)
+
 
 class RAGEngine:
     """
@@ -20,12 +64,19 @@ class RAGEngine:
     Uses llm.embeddings for generation and retrieval.
     """
 
-    def __init__(self, namespace: str = "rag"):
+    __slots__ = (
+        "pc", "index", "index_name", "api_key", "host", "namespace",
+        "initialized", "dimensions", "_embedding_generator",
+    )
+
+    def __init__(self, namespace: str = "rag", embedding_cache_path: Optional[str] = None):
         """
         Initialize RAG engine with Pinecone.
 
         Args:
             namespace: Pinecone namespace to use (default: "rag" for fraud patterns)
+            embedding_cache_path: Optional SQLite file persisting HF embeddings across
+                runs (used by the preload script so reruns skip the embedding API)
         """
         self.pc = None
         self.index = None
@@ -35,7 +86,12 @@ class RAGEngine:
         self.namespace = namespace
         self.initialized = False
         self.dimensions = DEFAULT_DIMENSIONS
-        self._embedding_generator = EmbeddingGenerator(dimensions=self.dimensions)
+        disk_cache = (
+            DiskEmbeddingCache(embedding_cache_path, HF_EMBEDDING_MODEL, self.dimensions)
+            if embedding_cache_path
+            else None
+        )
+        self._embedding_generator = EmbeddingGenerator(dimensions=self.dimensions, disk_cache=disk_cache)
     
     def initialize(self):
         """Initialize Pinecone connection and verify index exists"""
@@ -94,9 +150,8 @@ class RAGEngine:
 
         try:
             logger.info(f"🔍 [Pinecone] Querying namespace '{self.namespace}' for sector '{sector}' (top_k={n_results})")
-            query_embedding = self._embedding_generator.generate(query_text)
-            embedding_source = getattr(self._embedding_generator, "last_source", "unknown")
-            logger.debug(f"[Pinecone] Embedding generated (dimensions: {len(query_embedding)}, source={embedding_source})")
+            query_embedding, embedding_source = self._embedding_generator.generate_with_source(query_text)
+            logger.debug("[Pinecone] Embedding generated (dimensions: %d, source=%s)", len(query_embedding), embedding_source)
             return query_similar_patterns(
                 self.index,
                 self.namespace,
@@ -123,60 +178,256 @@ class RAGEngine:
             return 0
         
         try:
-            logger.debug(f"📊 [Pinecone] Fetching vector count for namespace '{self.namespace}'...")
+            logger.debug("📊 [Pinecone] Fetching vector count for namespace '%s'...", self.namespace)
             stats = self.index.describe_index_stats()
             namespace_stats = stats.get('namespaces', {}).get(self.namespace, {})
             count = namespace_stats.get('vector_count', 0)
-            logger.debug(f"📊 [Pinecone] Namespace '{self.namespace}' contains {count} vectors")
+            logger.debug("📊 [Pinecone] Namespace '%s' contains %s vectors", self.namespace, count)
             return count
         except Exception as e:
             logger.error(f"❌ [Pinecone] Error getting index stats for namespace '{self.namespace}': {e}")
             return 0
     
-    def upsert_patterns(self, patterns: List[Dict[str, Any]], sector: str):
+    def _upsert_vectors(
+        self,
+        vectors: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        """
+        Upsert in batch_size chunks (default UPSERT_BATCH_SIZE), up to concurrency
+        requests in parallel (default UPSERT_CONCURRENCY).
+        """
+        batch_size = max(1, batch_size or UPSERT_BATCH_SIZE)
+        concurrency = concurrency or UPSERT_CONCURRENCY
+        batches = [vectors[i:i + batch_size] for i in range(0, len(vectors), batch_size)]
+        total_batches = len(batches)
+        logger.info(
+            "📤 [Pinecone] Upserting %d vectors to namespace '%s' in %d batch(es)",
+            len(vectors), self.namespace, total_batches,
+        )
+
+        def upsert(batch_num: int, batch: List[Dict[str, Any]]) -> None:
+            self._upsert_batch(batch)
+            logger.info(
+                "✅ [Pinecone] Batch %d/%d (%d vectors) upserted to namespace '%s'",
+                batch_num, total_batches, len(batch), self.namespace,
+            )
+
+        if total_batches <= 1 or concurrency <= 1:
+            for batch_num, batch in enumerate(batches, 1):
+                upsert(batch_num, batch)
+            return
+        with ThreadPoolExecutor(max_workers=min(concurrency, total_batches)) as pool:
+            futures = [pool.submit(upsert, n, batch) for n, batch in enumerate(batches, 1)]
+            # result() re-raises the first failed batch
+            for future in futures:
+                future.result()
+
+    def _upsert_batch(self, batch: List[Dict[str, Any]], attempt: int = 0) -> None:
+        """
+        Upsert one batch. 429/5xx responses sleep with exponential backoff and
+        retry each half separately (up to UPSERT_MAX_RETRIES deep); any other
+        error, or running out of retries, is raised.
+        """
+        try:
+            self.index.upsert(vectors=batch, namespace=self.namespace)
+        except Exception as e:
+            status = _upsert_error_status(e)
+            if status not in _UPSERT_RETRY_STATUSES or attempt >= UPSERT_MAX_RETRIES:
+                raise
+            delay = min(_UPSERT_BACKOFF_SECONDS * 2 ** attempt, _UPSERT_MAX_BACKOFF_SECONDS)
+            delay *= 1 + random.random() * 0.5
+            logger.warning(
+                "⚠️  [Pinecone] Upsert of %d vectors got HTTP %s, retrying in %.1fs (attempt %d/%d)",
+                len(batch), status, delay, attempt + 1, UPSERT_MAX_RETRIES,
+            )
+            time.sleep(delay)
+            if len(batch) > 1:
+                mid = len(batch) // 2
+                self._upsert_batch(batch[:mid], attempt + 1)
+                self._upsert_batch(batch[mid:], attempt + 1)
+            else:
+                self._upsert_batch(batch, attempt + 1)
+
+    def embed_patterns(self, patterns_by_sector: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[List[float]]]:
+        """
+        Embed every sector's pattern descriptions in one batched pass, keyed back by sector.
+        Raises if any description fell back to a hash vector: stored under its
+        content-derived ID it would be skipped by every later preload.
+        """
+        descriptions = [p["description"] for patterns in patterns_by_sector.values() for p in patterns]
+        embeddings, sources = self._embedding_generator.generate_batch_with_sources(descriptions)
+        hashed = sources.count("hash")
+        if hashed:
+            raise RuntimeError(
+                f"{hashed}/{len(descriptions)} pattern embeddings fell back to hash vectors; "
+                "refusing to store non-semantic vectors. Check HUGGINGFACE_API_TOKEN / HF availability."
+            )
+        by_sector: Dict[str, List[List[float]]] = {}
+        offset = 0
+        for sector, patterns in patterns_by_sector.items():
+            by_sector[sector] = embeddings[offset:offset + len(patterns)]
+            offset += len(patterns)
+        return by_sector
+
+    def existing_vector_ids(self, prefix: str = "", candidate_ids: Optional[Iterable[str]] = None) -> set:
+        """
+        IDs already stored in the namespace (one paginated list walk). Pod-based
+        indexes don't support listing; there, candidate_ids (if given) are
+        probed with batched fetches instead. Any other failure returns an empty
+        set so callers simply upsert everything.
+        """
+        if not self.initialized or not self.index:
+            return set()
+        ids = set()
+        try:
+            for page in self.index.list(prefix=prefix, namespace=self.namespace):
+                # Older clients yield plain ID lists; newer ones ListResponse pages
+                ids.update(page if isinstance(page, list) else (item.id for item in page.vectors))
+        except Exception as e:
+            if candidate_ids is None:
+                logger.warning(f"⚠️  [Pinecone] Cannot list vector IDs in namespace '{self.namespace}': {e}")
+                return set()
+            logger.info("[Pinecone] Listing unavailable in namespace '%s' (%s); probing with fetch", self.namespace, e)
+            return self._fetch_existing_ids(candidate_ids)
+        return ids
+
+    def _fetch_existing_ids(self, candidate_ids: Iterable[str]) -> set:
+        """Subset of candidate_ids present in the namespace, FETCH_BATCH_SIZE IDs per fetch."""
+        candidates = list(candidate_ids)
+        ids = set()
+        try:
+            for start in range(0, len(candidates), FETCH_BATCH_SIZE):
+                response = self.index.fetch(ids=candidates[start:start + FETCH_BATCH_SIZE], namespace=self.namespace)
+                vectors = response.vectors if hasattr(response, "vectors") else response.get("vectors", {})
+                ids.update(vectors)
+        except Exception as e:
+            logger.warning(f"⚠️  [Pinecone] Cannot fetch vector IDs in namespace '{self.namespace}': {e}")
+            return set()
+        return ids
+
+    def delete_vectors(self, ids: Iterable[str]) -> int:
+        """Delete the given vector IDs from the namespace, DELETE_BATCH_SIZE per request; returns the count."""
+        if not self.initialized or not self.index:
+            logger.error("Pinecone not initialized, cannot delete vectors")
+            return 0
+        ids = sorted(ids)
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            self.index.delete(ids=ids[start:start + DELETE_BATCH_SIZE], namespace=self.namespace)
+        if ids:
+            logger.info(f"🗑️  [Pinecone] Deleted {len(ids)} vector(s) from namespace '{self.namespace}'")
+        return len(ids)
+
+    def wait_for_count(self, expected: int, timeout: float = 30.0, initial_delay: float = 0.5) -> int:
+        """
+        Poll the namespace vector count (stats are eventually consistent) with 1.5x
+        backoff until it reaches expected or timeout elapses; returns the last count.
+        """
+        deadline = time.monotonic() + timeout
+        delay = initial_delay
+        while True:
+            count = self.get_collection_count()
+            remaining = deadline - time.monotonic()
+            if count >= expected or remaining <= 0:
+                return count
+            time.sleep(min(delay, remaining))
+            delay *= 1.5
+
+    def upsert_patterns(
+        self,
+        patterns: List[Dict[str, Any]],
+        sector: str,
+        embeddings: Optional[List[List[float]]] = None,
+    ):
         """
         Upsert fraud patterns into Pinecone.
         
         Args:
             patterns: List of pattern dicts with 'description', 'risk_level', 'indicators'
             sector: Sector name (banking, medical, ecommerce, supply_chain)
+            embeddings: Optional precomputed vectors (see embed_patterns), one per pattern
         """
         if not self.initialized or not self.index:
             logger.error("Pinecone not initialized, cannot upsert patterns")
             return
         
         try:
-            vectors = []
-            for i, pattern in enumerate(patterns):
-                embedding = self._embedding_generator.generate(pattern["description"])
-                
-                vector_id = f"{sector}_{i}_{hash(pattern['description']) % 100000}"
-                metadata = {
-                    "sector": sector,
-                    "description": pattern["description"],
-                    "risk_level": pattern.get("risk_level", "medium"),
-                    "indicators": json.dumps(pattern.get("indicators", []))
-                }
-                
-                vectors.append({
-                    "id": vector_id,
-                    "values": embedding,
-                    "metadata": metadata
-                })
-            
-            batch_size = 100
-            total_batches = (len(vectors) + batch_size - 1) // batch_size
-            logger.info(f"📤 [Pinecone] Upserting {len(vectors)} vectors to namespace '{self.namespace}' in {total_batches} batch(es)")
-            
-            for i in range(0, len(vectors), batch_size):
-                batch = vectors[i:i + batch_size]
-                batch_num = i//batch_size + 1
-                logger.info(f"📤 [Pinecone] Upserting batch {batch_num}/{total_batches} ({len(batch)} vectors) to namespace '{self.namespace}'...")
-                self.index.upsert(vectors=batch, namespace=self.namespace)
-                logger.info(f"✅ [Pinecone] Batch {batch_num} upserted successfully to namespace '{self.namespace}'")
+            if embeddings is None:
+                embeddings = self.embed_patterns({sector: patterns})[sector]
+            self._upsert_vectors(self._build_vectors(patterns, sector, embeddings))
             
             logger.info(f"✅ [Pinecone] Upserted {len(patterns)} patterns for sector '{sector}' to namespace '{self.namespace}'")
             
         except Exception as e:
             logger.error(f"❌ [Pinecone] Error upserting patterns to namespace '{self.namespace}': {e}", exc_info=True)
             raise
+
+    def upsert_all_patterns(
+        self,
+        patterns_by_sector: Dict[str, List[Dict[str, Any]]],
+        skip_ids: AbstractSet[str] = frozenset(),
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+    ) -> int:
+        """
+        Embed and upsert every sector's patterns as one vector set, so batches
+        fill to batch_size across sector boundaries. Patterns whose
+        vector ID is in skip_ids are neither embedded nor sent (resumable
+        preloads). Returns the count upserted.
+        """
+        if not self.initialized or not self.index:
+            logger.error("Pinecone not initialized, cannot upsert patterns")
+            return 0
+
+        try:
+            pending = {
+                sector: [p for p in patterns if self.pattern_vector_id(sector, p) not in skip_ids]
+                for sector, patterns in patterns_by_sector.items()
+            }
+            skipped = sum(len(p) for p in patterns_by_sector.values()) - sum(len(p) for p in pending.values())
+            if skipped:
+                logger.info(f"⏭️  [Pinecone] Skipping {skipped} pattern(s) already upserted to namespace '{self.namespace}'")
+            embeddings = self.embed_patterns(pending)
+            vectors = [
+                vector
+                for sector, patterns in pending.items()
+                for vector in self._build_vectors(patterns, sector, embeddings[sector])
+            ]
+            if not vectors:
+                return 0
+            self._upsert_vectors(vectors, batch_size, concurrency)
+            logger.info(
+                f"✅ [Pinecone] Upserted {len(vectors)} patterns across {len(pending)} sector(s) "
+                f"to namespace '{self.namespace}'"
+            )
+            return len(vectors)
+        except Exception as e:
+            logger.error(f"❌ [Pinecone] Error upserting patterns to namespace '{self.namespace}': {e}", exc_info=True)
+            raise
+
+    @staticmethod
+    def pattern_vector_id(sector: str, pattern: Dict[str, Any]) -> str:
+        """Content-derived vector ID: the same pattern maps to the same ID on every run."""
+        payload = json.dumps(pattern, sort_keys=True, ensure_ascii=False)
+        return f"{sector}_{hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()}"
+
+    @staticmethod
+    def _build_vectors(
+        patterns: List[Dict[str, Any]], sector: str, embeddings: List[List[float]]
+    ) -> List[Dict[str, Any]]:
+        vectors = []
+        for pattern, embedding in zip(patterns, embeddings):
+            vector_id = RAGEngine.pattern_vector_id(sector, pattern)
+            metadata = {
+                "sector": sector,
+                "description": pattern["description"],
+                "risk_level": pattern.get("risk_level", "medium"),
+                "indicators": _dumps_indicators(pattern.get("indicators", []))
+            }
+            vectors.append({
+                "id": vector_id,
+                "values": embedding,
+                "metadata": metadata
+            })
+        return vectors
@@ -61,6 +61,8 @@ class LangGraphRouter:
     and an explicit post-score guardrail node.
     """
 
+    __slots__ = ("rag_engine", "hf_client", "workflow")
+
     def __init__(self, rag_engine, hf_client=None):
         self.rag_engine = rag_engine
         self.hf_client = hf_client
@@ -514,13 +516,10 @@ class LangGraphRouter:
 
     def _format_query(self, sector: str, data: Dict[str, Any]) -> str:
         """Format input data as query text for RAG (exclude bulky MCP blobs)."""
-        clean = {k: v for k, v in data.items() if not isinstance(v, (dict, list)) or k in (
-            "indicators", "risk_factors"
-        )}
         # Prefer original form fields only for embedding quality
-        form_keys = [k for k in data.keys() if not k.endswith("_data") and k != "transaction_history"]
-        clean = {k: data[k] for k in form_keys}
-        return json.dumps(clean, indent=2, default=str)
+        clean = {k: v for k, v in data.items() if not k.endswith("_data") and k != "transaction_history"}
+        # Sorted keys: the same fields in any order embed (and hit the embedding memo) identically
+        return json.dumps(clean, indent=2, sort_keys=True, default=str)
 
     def _calculate_fraud_score(self, sector: str, data: Dict[str, Any], rag_context: str) -> float:
         """Calculate fraud score using sector chains with RAG enhancement."""
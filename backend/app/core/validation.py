@@ -3,20 +3,21 @@ LLM vs rule-based validation logic.
 Decides when to trust LLM scores vs fallback to rule-based scoring.
 """
 import logging
+from bisect import bisect_right
 from typing import Dict, Any, Optional, Callable
 
 logger = logging.getLogger(__name__)
 
 
+_RISK_THRESHOLDS = (30, 60, 85)
+_RISK_LEVELS = ("low", "medium", "high", "critical")
+
+
 def get_risk_level(score: float) -> str:
     """Convert fraud score to risk level with consistent thresholds."""
-    if score >= 85:
-        return "critical"
-    elif score >= 60:
-        return "high"
-    elif score >= 30:
-        return "medium"
-    return "low"
+    if score != score:  # NaN fails every >= threshold check: "low", not "critical"
+        return _RISK_LEVELS[0]
+    return _RISK_LEVELS[bisect_right(_RISK_THRESHOLDS, score)]
 
 
 def validate_llm_result(
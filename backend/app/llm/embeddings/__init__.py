@@ -1,10 +1,13 @@
 """Embedding generation and vector retrieval for RAG."""
-from .generator import EmbeddingGenerator, DEFAULT_DIMENSIONS
+from .disk_cache import DiskEmbeddingCache
+from .generator import EmbeddingGenerator, DEFAULT_DIMENSIONS, HF_EMBEDDING_MODEL
 from .retriever import format_fraud_context, query_similar_patterns
 
 __all__ = [
+    "DiskEmbeddingCache",
     "EmbeddingGenerator",
     "DEFAULT_DIMENSIONS",
+    "HF_EMBEDDING_MODEL",
     "format_fraud_context",
     "query_similar_patterns",
 ]
@@ -0,0 +1,61 @@
+"""
+Persistent text -> embedding store for batch jobs (e.g. the Pinecone preload).
+
+Keys are blake2b(model, dimensions, text), so changing the model or index
+width never serves stale vectors. Only real HF embeddings are written;
+hash-fallback vectors are cheap to recompute and must not be pinned.
+"""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+
+
+class DiskEmbeddingCache:
+    """SQLite-backed embedding store; vectors are kept as raw float64 bytes."""
+
+    def __init__(self, path: str, model: str, dimensions: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._prefix = f"{model}\0{dimensions}\0".encode("utf-8")
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.blake2b(self._prefix + text.encode("utf-8"), digest_size=16).digest()
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the stored vectors for whichever texts have one."""
+        keys = {self._key(text): text for text in texts}
+        if not keys:
+            return {}
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            # One IN (...) query per 500 keys stays under SQLite's variable limit
+            key_list = list(keys)
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, vector in rows:
+                    found[keys[key]] = np.frombuffer(vector, dtype=np.float64).tolist()
+        return found
+
+    def put_many(self, embeddings: Dict[str, List[float]]) -> None:
+        if not embeddings:
+            return
+        rows = [
+            (self._key(text), np.asarray(vector, dtype=np.float64).tobytes())
+            for text, vector in embeddings.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -10,15 +10,32 @@ A deterministic hash fallback exists only to keep the service alive when HF
 is unreachable; hash vectors carry no semantic meaning, so retrieval quality
 degrades and we log loudly when it happens.
 """
-from typing import List, Optional
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import hashlib
 import os
 import logging
+import threading
+
+import httpx
+import numpy as np
+
+from .disk_cache import DiskEmbeddingCache
 
 logger = logging.getLogger(__name__)
 
 # Must match the Pinecone index dimension (override via env for new indexes)
 DEFAULT_DIMENSIONS = int(os.getenv("PINECONE_DIMENSIONS", "2048"))
 
+# Embeddings kept per generator, keyed by text (LRU; 0 disables). Repeat
+# queries for the same wallet/provider/seller skip the HF round trip.
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+
+# Texts per HF feature-extraction request in generate_batch
+HF_EMBEDDING_BATCH_SIZE = 32
+
+HF_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
 # HF moved inference to router.huggingface.co; the old
 # api-inference.huggingface.co pipeline endpoint is deprecated.
 HF_EMBEDDING_URLS = [
@@ -33,38 +50,135 @@ class EmbeddingGenerator:
     Uses HF inference API with hash-based fallback.
     """
 
-    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS):
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, disk_cache: Optional[DiskEmbeddingCache] = None):
         self.dimensions = dimensions
-        self._cache: dict = {}
-        self.last_source: str = "none"  # "hf" | "hash" - exposed for observability
+        # Optional persistent store consulted by generate_batch (batch jobs only)
+        self._disk_cache = disk_cache
+        # text -> (embedding, source); the source travels with cached vectors
+        self._cache: "OrderedDict[str, Tuple[List[float], str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # "hf" | "hash" of the most recent call - observability only; it is
+        # shared across threads, so callers that act on the source should use
+        # generate_with_source / generate_batch_with_sources instead
+        self.last_source: str = "none"
 
     def generate(self, text: str) -> List[float]:
         """
         Generate embedding for text.
         Uses HF API first, falls back to hash-based embedding if unavailable.
         """
-        if text in self._cache:
-            return self._cache[text]
+        return self.generate_with_source(text)[0]
+
+    def generate_with_source(self, text: str) -> Tuple[List[float], str]:
+        """Like generate(), also returning the source ("hf" | "hash") of this text's vector."""
+        with self._cache_lock:
+            cached = self._cache.get(text)
+            if cached is not None:
+                self._cache.move_to_end(text)
+        if cached is not None:
+            self.last_source = cached[1]
+            return cached
 
         embedding = self._try_hf_embedding(text)
         if embedding is not None:
-            self.last_source = "hf"
+            source = "hf"
         else:
             logger.warning(
                 "Using hash-based fallback embedding - RAG retrieval will be "
                 "non-semantic for this query. Check HUGGINGFACE_API_TOKEN / HF availability."
             )
             embedding = self._hash_fallback(text)
-            self.last_source = "hash"
+            source = "hash"
 
-        self._cache[text] = embedding
-        return embedding
+        self.last_source = source
+        self._remember(text, embedding, source)
+        return embedding, source
+
+    def generate_batch(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, one HF request per HF_EMBEDDING_BATCH_SIZE
+        uncached texts. Duplicates are embedded once; anything HF cannot embed
+        falls back to a hash vector (last_source is "hash" if any did).
+        """
+        return self.generate_batch_with_sources(texts)[0]
+
+    def generate_batch_with_sources(self, texts: List[str]) -> Tuple[List[List[float]], List[str]]:
+        """Like generate_batch(), also returning each text's source ("hf" | "hash")."""
+        results: List[Optional[List[float]]] = []
+        sources: List[str] = []
+        pending: Dict[str, List[int]] = {}
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                cached = self._cache.get(text)
+                if cached is not None:
+                    self._cache.move_to_end(text)
+                    embedding, source = cached
+                else:
+                    pending.setdefault(text, []).append(i)
+                    embedding, source = None, "none"
+                results.append(embedding)
+                sources.append(source)
+
+        misses = list(pending)
+        stored: Dict[str, List[float]] = {}
+        if self._disk_cache is not None and misses:
+            # Only HF vectors are ever persisted
+            stored = self._disk_cache.get_many(misses)
+            for text, embedding in stored.items():
+                self._remember(text, embedding, "hf")
+                for i in pending[text]:
+                    results[i] = embedding
+                    sources[i] = "hf"
+            misses = [text for text in misses if text not in stored]
+
+        hashed = 0
+        for start in range(0, len(misses), HF_EMBEDDING_BATCH_SIZE):
+            chunk = misses[start:start + HF_EMBEDDING_BATCH_SIZE]
+            embeddings = self._try_hf_embeddings(chunk) or [None] * len(chunk)
+            fresh: Dict[str, List[float]] = {}
+            for text, embedding in zip(chunk, embeddings):
+                if embedding is None:
+                    embedding = self._hash_fallback(text)
+                    source = "hash"
+                    hashed += 1
+                else:
+                    fresh[text] = embedding
+                    source = "hf"
+                self._remember(text, embedding, source)
+                for i in pending[text]:
+                    results[i] = embedding
+                    sources[i] = source
+            if self._disk_cache is not None:
+                self._disk_cache.put_many(fresh)
+
+        if hashed:
+            logger.warning(
+                f"Using hash-based fallback embeddings for {hashed}/{len(misses)} texts - "
+                "RAG retrieval will be non-semantic for them. Check HUGGINGFACE_API_TOKEN / HF availability."
+            )
+        if sources:
+            self.last_source = "hash" if "hash" in sources else "hf"
+        return results, sources
+
+    def _remember(self, text: str, embedding: List[float], source: str) -> None:
+        if EMBEDDING_CACHE_SIZE > 0:
+            with self._cache_lock:
+                self._cache[text] = (embedding, source)
+                self._cache.move_to_end(text)
+                while len(self._cache) > EMBEDDING_CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+    def _fit_dimensions(self, embedding: List[float]) -> List[float]:
+        """Zero-pad to the index dimension (cosine-similarity safe)."""
+        if len(embedding) < self.dimensions:
+            embedding.extend([0.0] * (self.dimensions - len(embedding)))
+        return embedding[: self.dimensions]
 
     def _try_hf_embedding(self, text: str) -> Optional[List[float]]:
         """Try Hugging Face inference API (current router URL first, legacy second)."""
         try:
+            # Deferred: app.core imports this package (via rag_engine)
             from app.core.security import get_huggingface_token
-            import httpx
 
             hf_token = get_huggingface_token()
             if not hf_token:
@@ -84,10 +198,7 @@ class EmbeddingGenerator:
                     embedding = response.json()
                     if isinstance(embedding[0], list):
                         embedding = embedding[0]
-                    # Zero-pad to the index dimension (cosine-similarity safe)
-                    if len(embedding) < self.dimensions:
-                        embedding.extend([0.0] * (self.dimensions - len(embedding)))
-                    return embedding[: self.dimensions]
+                    return self._fit_dimensions(embedding)
                 except httpx.HTTPError:
                     continue
             return None
@@ -95,14 +206,43 @@ class EmbeddingGenerator:
             logger.warning(f"HF embedding failed, using fallback: {e}")
             return None
 
+    def _try_hf_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Embed a list of texts in one HF feature-extraction request (same URL order)."""
+        try:
+            # Deferred: app.core imports this package (via rag_engine)
+            from app.core.security import get_huggingface_token
+
+            hf_token = get_huggingface_token()
+            if not hf_token:
+                return None
+
+            for url in HF_EMBEDDING_URLS:
+                try:
+                    response = httpx.post(
+                        url,
+                        headers={"Authorization": f"Bearer {hf_token}"},
+                        json={"inputs": texts},
+                        timeout=30.0,
+                    )
+                    if response.status_code != 200:
+                        continue
+
+                    embeddings = response.json()
+                    if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                        continue
+                    return [
+                        self._fit_dimensions(e[0] if isinstance(e[0], list) else e)
+                        for e in embeddings
+                    ]
+                except httpx.HTTPError:
+                    continue
+            return None
+        except Exception as e:
+            logger.warning(f"HF batch embedding failed, using fallback: {e}")
+            return None
+
     def _hash_fallback(self, text: str) -> List[float]:
         """Deterministic hash-based fallback - keeps the service alive, not semantic."""
-        import hashlib
-
-        hash_obj = hashlib.sha256(text.encode())
-        hash_bytes = hash_obj.digest()
-        embedding = []
-        for i in range(self.dimensions):
-            byte_idx = i % len(hash_bytes)
-            embedding.append((hash_bytes[byte_idx] / 255.0) * 2 - 1)
-        return embedding
+        # SHAKE-256 yields one independent byte per dimension in a single call
+        hash_bytes = np.frombuffer(hashlib.shake_256(text.encode()).digest(self.dimensions), dtype=np.uint8)
+        return (hash_bytes / 255.0 * 2 - 1).tolist()
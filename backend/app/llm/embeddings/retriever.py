@@ -7,9 +7,21 @@ from typing import Dict, List, Any
 import json
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
+def _loads_indicators(raw: str) -> List[str]:
+    """Decode the JSON-string indicators metadata (orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
 def format_fraud_context(patterns: List[Dict[str, Any]]) -> str:
     """Format retrieved fraud patterns as context string."""
     if not patterns:
@@ -80,7 +92,7 @@ def query_similar_patterns(
         patterns.append({
             "description": metadata.get("description", ""),
             "risk_level": metadata.get("risk_level", "unknown"),
-            "indicators": json.loads(metadata.get("indicators", "[]")),
+            "indicators": _loads_indicators(metadata.get("indicators", "[]")),
             "score": score,
         })
 
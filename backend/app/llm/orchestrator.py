@@ -4,13 +4,29 @@ Unified LLM client for fraud detection with multi-provider support.
 Orchestrates: config, ofac, prompts, parsing, prechecks, providers.
 """
 import os
+import copy
+import hashlib
+import json
 import logging
+import random
+import threading
 import time
-from typing import Dict, Any, Optional, List, Tuple
+import weakref
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Any, Iterator, Optional, List, Tuple
 
 import httpx
-from huggingface_hub import InferenceClient
+from huggingface_hub import HfApi, InferenceClient
+from huggingface_hub.errors import HfHubHTTPError
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .chains import score_with_breakdown
 from .config import (
     SECTOR_MODELS,
     SECTOR_LOCATION_FIELDS,
@@ -18,15 +34,206 @@ from .config import (
     get_inference_defaults,
     format_model_name,
 )
+from . import medgemma_local
 from .ofac import check_ofac_in_data
 from .prompts import build_prompt, build_stage1_clinical_prompt, build_stage2_fraud_prompt
-from .parsing import parse_model_response, get_risk_level
+from .parsing import fraud_response_complete, parse_model_response, get_risk_level
 from .prechecks import check_extreme_fraud_patterns
+from .rate_limit import CircuitBreaker, TokenBucket
+from .semantic_cache import SEMANTIC_CACHE_ENABLED, SemanticResponseCache
 
 logger = logging.getLogger(__name__)
 
 LOG_STAGE1_VERBOSE = os.getenv("LOG_STAGE1_VERBOSE", "0").lower() in ("1", "true", "yes")
 
+# Parsed LLM results keyed by (sector, data, rag_context) hash (0 disables).
+# Retries, duplicate transactions and demo traffic re-send identical inputs.
+LLM_RESPONSE_CACHE_SIZE = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "1024"))
+LLM_RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", "600"))
+
+# Rule-based fallback results are deterministic per input; memoised during outages
+# so retry storms / duplicate webhooks don't re-run the sector chains.
+_RULE_FALLBACK_CACHE_SIZE = 1024
+
+# Hedged requests (0 disables): start the first fallback if the primary model
+# hasn't returned a usable result after this many seconds, and take the first win.
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "0"))
+
+# Max in-flight provider calls per analyze_fraud_batch (1 = serial).
+LLM_BATCH_CONCURRENCY = max(1, int(os.getenv("LLM_BATCH_CONCURRENCY", "8")))
+
+# Stream chat completions and stop reading (closing the connection) once a fraud
+# response has its score, risk level and a finished reasoning paragraph.
+LLM_STREAM_RESPONSES = os.getenv("LLM_STREAM_RESPONSES", "0").lower() in ("1", "true", "yes")
+
+# Keep-alive pool shared by all raw HTTP provider calls (OpenRouter, HF router).
+# Per-call timeouts still come from models.yaml inference defaults.
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+_HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Never sleep longer than this inside a request, whatever Retry-After says.
+_MAX_RETRY_AFTER_SECONDS = 30.0
+
+# Client-side token bucket per provider, shared by all request threads (0 disables).
+# Halves on every 429 and recovers additively, so instances sharing one API
+# token back off together instead of retry-storming the quota.
+LLM_PROVIDER_RATE_PER_SECOND = float(os.getenv("LLM_PROVIDER_RATE_PER_SECOND", "5"))
+LLM_PROVIDER_BURST = float(os.getenv("LLM_PROVIDER_BURST", "10"))
+_RATE_LIMIT_WAIT_SECONDS = 10.0
+
+# Per (provider, model) circuit breaker: after N consecutive failed calls, skip
+# that model for the cooldown instead of paying its timeout (0 failures disables).
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_COOLDOWN_SECONDS = float(os.getenv("LLM_BREAKER_COOLDOWN_SECONDS", "60"))
+
+
+def _json_bytes(payload: Dict[str, Any]) -> bytes:
+    """Encode a provider request body (orjson when available; callers set Content-Type)."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def _json_body(raw: Any) -> Any:
+    """Decode a provider response body or SSE event (bytes or str)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _parse_retry_after(headers: Any) -> Optional[float]:
+    """Retry-After in seconds; HTTP-date values fall back to our own backoff."""
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _error_status(exc: Exception) -> Tuple[Optional[int], Optional[float]]:
+    """(status_code, retry_after) from typed HF Hub / httpx HTTP errors."""
+    if isinstance(exc, (HfHubHTTPError, httpx.HTTPStatusError)) and exc.response is not None:
+        return exc.response.status_code, _parse_retry_after(exc.response.headers)
+    return getattr(exc, "status_code", None), None
+
+
+def _is_rate_limited(exc: Exception, status_code: Optional[int]) -> bool:
+    if status_code is not None:
+        return status_code == 429
+    # Untyped errors (no HTTP response attached) only carry a message
+    message = str(exc).lower()
+    error_type = type(exc).__name__.lower()
+    return (
+        "429" in message
+        or "rate limit" in message
+        or "too many requests" in message
+        or "ratelimit" in error_type
+        or "rate_limit" in error_type
+    )
+
+
+def _read_chat_stream(lines: Iterator[str], stop_early: bool) -> Dict[str, Any]:
+    """
+    Fold an OpenAI-style SSE chat stream into a non-streaming response body.
+
+    With stop_early, returns as soon as the fraud template is complete; the caller
+    then closes the connection so the remaining tokens are never generated.
+    """
+    content: List[str] = []
+    reasoning: List[str] = []
+    finish_reason: Optional[str] = None
+    usage: Dict[str, Any] = {}
+    for line in lines:
+        if not line.startswith("data:"):
+            continue  # blank keep-alives and ": PROCESSING" comments
+        raw = line[5:].strip()
+        if raw == "[DONE]":
+            break
+        event = _json_body(raw)
+        if event.get("error"):
+            raise ValueError(f"Stream error: {str(event['error'])[:200]}")
+        usage = event.get("usage") or usage
+        choices = event.get("choices") or ()
+        if not choices:
+            continue
+        delta = choices[0].get("delta") or {}
+        finish_reason = choices[0].get("finish_reason") or finish_reason
+        if delta.get("reasoning"):
+            reasoning.append(delta["reasoning"])
+        piece = delta.get("content")
+        if piece:
+            content.append(piece)
+            # Only re-check when a line break arrives — completion needs a blank line
+            if stop_early and "\n" in piece and fraud_response_complete("".join(content)):
+                finish_reason = "stop"
+                break
+    message = {"content": "".join(content), "reasoning": "".join(reasoning)}
+    return {"choices": [{"message": message, "finish_reason": finish_reason}], "usage": usage}
+
+
+def _collect_hf_chat_stream(chunks: Any, stop_early: bool) -> str:
+    """Join InferenceClient chat_completion(stream=True) deltas, closing early when complete."""
+    content: List[str] = []
+    try:
+        for chunk in chunks:
+            piece = chunk.choices[0].delta.content if chunk.choices else None
+            if piece:
+                content.append(piece)
+                if stop_early and "\n" in piece and fraud_response_complete("".join(content)):
+                    break
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+    return "".join(content)
+
+
+def _retry_delay(backoff: float, retry_after: Optional[float]) -> float:
+    """Honor a (capped) server Retry-After when longer than our backoff, plus up to 50% jitter."""
+    backoff = min(backoff, _MAX_RETRY_AFTER_SECONDS)
+    if retry_after:
+        backoff = max(backoff, min(retry_after, _MAX_RETRY_AFTER_SECONDS))
+    return backoff * (1 + random.random() * 0.5)
+
+
+# Single-stage routing order per sector, built once: (index, config) pairs for
+# primary + fallbacks, skipping entries without a provider/model. Index 0 = primary.
+_SECTOR_CANDIDATES: Dict[str, Tuple[Tuple[int, Dict[str, Any]], ...]] = {
+    sector: tuple(
+        (idx, cfg)
+        for idx, cfg in enumerate((model_config["primary"], *model_config.get("fallbacks", ())))
+        if cfg.get("provider") and cfg.get("model")
+    )
+    for sector, model_config in SECTOR_MODELS.items()
+    if not model_config.get("two_stage")
+}
+
+# Models known to not support chat_completion — go straight to text_generation
+_MODELS_NO_CHAT = (
+    "instruction-pretrain/finance-Llama3-8B",
+    "meta-llama/Llama-3.1-8B-Instruct",
+    "mistralai/Mistral-7B-Instruct-v0.2",
+)
+
+# Models that ONLY support chat_completion — NEVER fall back to text_generation
+# Qwen3-32B (primary) and Qwen2.5-* (legacy) use the conversational interface only.
+# MedGemma-27B is also instruction-tuned and chat-only.
+_MODELS_CHAT_ONLY = (
+    "Qwen",          # matches Qwen/Qwen3-32B, Qwen/Qwen2.5-*, etc.
+    "qwen",
+    "medgemma",      # google/medgemma-27b-text-it
+    "MedGemma",
+)
+
+
+@lru_cache(maxsize=256)
+def _hf_chat_support(model_name: str) -> Tuple[bool, bool]:
+    """(skip_chat, chat_only) for an HF model id; substring match, memoised per model."""
+    skip_chat = any(no_chat in model_name for no_chat in _MODELS_NO_CHAT)
+    chat_only = any(chat_only_model in model_name for chat_only_model in _MODELS_CHAT_ONLY)
+    return skip_chat, chat_only
+
+
 try:
     from gradio_client import Client
     GRADIO_AVAILABLE = True
@@ -50,9 +257,9 @@ class LLMClient:
         # Hugging Face router clients — keyed by Inference Provider partner.
         # MedGemma (and some Qwen routes) are only live on a specific partner
         # (e.g. featherless-ai). Auto routing returns 400 "not supported by any provider".
+        # Built on first HF call — OpenRouter-only deployments never construct one.
         self._hf_clients: Dict[str, InferenceClient] = {}
-        self.client = self._get_hf_client(None)
-        logger.info("✅ InferenceClient initialized (HF router)")
+        self._hf_clients_lock = threading.Lock()
 
         # OpenRouter configuration (primary provider for all sectors)
         self.openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
@@ -61,6 +268,147 @@ class LLMClient:
         else:
             logger.info("✅ OpenRouter configured (primary provider for fraud-specialized models)")
         self._model_probe_cache: Dict[str, Dict[str, Any]] = {}
+        # Reused across requests so retries/fallbacks skip the TCP+TLS handshake.
+        self._http = httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT)
+        self._http_finalizer = weakref.finalize(self, self._http.close)
+        # key -> (stored_at monotonic, parsed result); guarded for threadpool callers
+        self._response_cache: "OrderedDict[bytes, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._semantic_cache = SemanticResponseCache() if SEMANTIC_CACHE_ENABLED else None
+        self._rule_fallback_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._hedge_pool_lock = threading.Lock()
+        self._rate_limiters: Dict[str, TokenBucket] = (
+            {
+                provider: TokenBucket(LLM_PROVIDER_RATE_PER_SECOND, LLM_PROVIDER_BURST)
+                for provider in ("hf", "openrouter", "hf_space")
+            }
+            if LLM_PROVIDER_RATE_PER_SECOND > 0
+            else {}
+        )
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close pooled HTTP connections (also runs on garbage collection / interpreter exit)."""
+        self._http_finalizer()
+        with self._hedge_pool_lock:
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False)
+
+    def _acquire_rate_slot(self, provider: str) -> bool:
+        """Wait for a client-side rate-limit token; False means skip this provider call."""
+        bucket = self._rate_limiters.get(provider)
+        if bucket is None or bucket.acquire(_RATE_LIMIT_WAIT_SECONDS):
+            return True
+        logger.warning(f"⚠️  Client-side {provider} rate limit saturated (rate={bucket.rate:.2f}/s) — skipping call")
+        return False
+
+    def _record_provider_outcome(self, provider: str, rate_limited: bool) -> None:
+        """Feed a call outcome into the provider's adaptive (AIMD) bucket."""
+        bucket = self._rate_limiters.get(provider)
+        if bucket is None:
+            return
+        if rate_limited:
+            bucket.record_rate_limited()
+            logger.info(f"  → {provider} client-side rate lowered to {bucket.rate:.2f}/s")
+        else:
+            bucket.record_success()
+
+    def _breaker(self, provider: str, model_name: str) -> CircuitBreaker:
+        key = (provider, model_name)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._breakers_lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_COOLDOWN_SECONDS)
+                )
+        return breaker
+
+    def _guarded_call(self, provider: str, model_name: str, call, *args, **kwargs) -> Optional[Dict[str, Any]]:
+        """
+        Run a provider call behind its (provider, model) circuit breaker.
+
+        None or an exception counts as a failure; an open breaker returns None
+        immediately so the caller moves on to the next candidate.
+        """
+        if LLM_BREAKER_FAILURES <= 0:
+            return call(*args, **kwargs)
+        breaker = self._breaker(provider, model_name)
+        if not breaker.allow():
+            logger.warning(f"⚡ [Breaker] {provider}/{model_name} open — skipping (cooldown {LLM_BREAKER_COOLDOWN_SECONDS:.0f}s)")
+            return None
+        try:
+            result = call(*args, **kwargs)
+        except Exception:
+            if breaker.record_failure():
+                logger.warning(f"⚡ [Breaker] {provider}/{model_name} opened after {breaker.failures} failures")
+            raise
+        if result is None:
+            if breaker.record_failure():
+                logger.warning(f"⚡ [Breaker] {provider}/{model_name} opened after {breaker.failures} failures")
+        else:
+            if breaker.failures:
+                logger.info(f"⚡ [Breaker] {provider}/{model_name} recovered after {breaker.failures} failures")
+            breaker.record_success()
+        return result
+
+    @staticmethod
+    def _response_cache_key(sector: str, data: Dict[str, Any], rag_context: Optional[str]) -> bytes:
+        """Hash the analysis inputs; RAG whitespace is normalised so reformatting still hits."""
+        payload = json.dumps(
+            {"s": sector, "d": data, "r": " ".join(rag_context.split()) if rag_context else None},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()
+
+    def _get_cached_response(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Return a copy of a fresh cached result (LRU touch) or None."""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] > LLM_RESPONSE_CACHE_TTL_SECONDS:
+                del self._response_cache[key]
+                entry = None
+            if entry is None:
+                self.cache_misses += 1
+                return None
+            self._response_cache.move_to_end(key)
+            self.cache_hits += 1
+            cached = entry[1]
+        return copy.deepcopy(cached)
+
+    def _store_cached_response(self, key: bytes, result: Dict[str, Any]) -> None:
+        """Store a fully LLM-scored result, evicting the least recently used entry."""
+        if LLM_RESPONSE_CACHE_SIZE <= 0:
+            return
+        # Unparsed scores, prechecks, rule-based fallbacks and the degraded
+        # Stage 1 + billing-rules blend should be retried, not pinned.
+        if result.get("score_parsed") is not True or result.get("stage2_model") == "rule_based":
+            return
+        entry = (time.monotonic(), copy.deepcopy(result))
+        with self._response_cache_lock:
+            self._response_cache[key] = entry
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > LLM_RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
+
+    @property
+    def client(self) -> InferenceClient:
+        """Auto-routed HF InferenceClient, created lazily on first use."""
+        return self._get_hf_client(None)
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        """Lazily create the shared hedge pool (analyze_fraud_batch workers may race here)."""
+        pool = self._hedge_pool
+        if pool is not None:
+            return pool
+        with self._hedge_pool_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-hedge")
+            return self._hedge_pool
 
     def _get_hf_client(self, hf_provider: Optional[str] = None) -> InferenceClient:
         """Return a cached InferenceClient pinned to an HF Inference Provider partner."""
@@ -68,19 +416,50 @@ class LLMClient:
         client = self._hf_clients.get(key)
         if client is not None:
             return client
-        kwargs: Dict[str, Any] = {"token": self.api_token}
-        if key != "auto":
-            kwargs["provider"] = key
-        client = InferenceClient(**kwargs)
-        self._hf_clients[key] = client
+        with self._hf_clients_lock:
+            client = self._hf_clients.get(key)
+            if client is not None:
+                return client
+            kwargs: Dict[str, Any] = {"token": self.api_token}
+            if key != "auto":
+                kwargs["provider"] = key
+            client = InferenceClient(**kwargs)
+            self._hf_clients[key] = client
         logger.info(f"✅ HF InferenceClient ready (provider={key})")
         return client
 
+    def _post_chat(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        payload: Dict[str, Any],
+        timeout: float,
+        stop_early: bool,
+    ) -> Tuple[httpx.Response, Optional[Dict[str, Any]]]:
+        """
+        POST a chat completion; with LLM_STREAM_RESPONSES, stream it instead.
+
+        Returns (response, streamed body). The streamed body is None when not
+        streaming or on a non-200 status, whose body is read for the callers'
+        usual error handling.
+        """
+        if not LLM_STREAM_RESPONSES:
+            return self._http.post(url, headers=headers, content=_json_bytes(payload), timeout=timeout), None
+        with self._http.stream(
+            "POST", url, headers=headers, content=_json_bytes({**payload, "stream": True}), timeout=timeout
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                return response, None
+            # Leaving the block closes the connection, abandoning unread tokens.
+            return response, _read_chat_stream(response.iter_lines(), stop_early)
+
     def _hf_provider_chat_completion(
         self,
         model_name: str,
         prompt: str,
         hf_provider: str,
+        stop_early: bool = False,
     ) -> str:
         """
         Call an HF Inference Provider via the OpenAI-compatible router URL.
@@ -106,16 +485,15 @@ class LLMClient:
             "Content-Type": "application/json",
         }
         timeout = float(hf_defaults.get("timeout_seconds", 120) or 120)
-        with httpx.Client(timeout=timeout) as http:
-            response = http.post(url, headers=headers, json=payload)
-            if response.status_code == 402:
-                raise httpx.HTTPStatusError(
-                    "Payment Required",
-                    request=response.request,
-                    response=response,
-                )
-            response.raise_for_status()
-            data = response.json()
+        response, streamed = self._post_chat(url, headers, payload, timeout, stop_early)
+        if response.status_code == 402:
+            raise httpx.HTTPStatusError(
+                "Payment Required",
+                request=response.request,
+                response=response,
+            )
+        response.raise_for_status()
+        data = streamed if streamed is not None else _json_body(response.content)
         try:
             content = data["choices"][0]["message"]["content"]
         except (KeyError, IndexError, TypeError) as exc:
@@ -194,7 +572,7 @@ class LLMClient:
                     "max_tokens": 8,
                     "temperature": 0.0,
                 }
-                resp = httpx.post(
+                resp = self._http.post(
                     "https://openrouter.ai/api/v1/chat/completions",
                     headers=headers,
                     json=payload,
@@ -266,6 +644,12 @@ class LLMClient:
         model_config = SECTOR_MODELS.get(sector)
         if not model_config:
             raise ValueError(f"Unknown sector: {sector}")
+
+        cache_key = self._response_cache_key(sector, data, rag_context)
+        cached = self._get_cached_response(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ [Cache] Reusing LLM result for identical {sector} input")
+            return cached
         
         # ============================================================
         # TWO-STAGE PROCESSING (MEDICAL CLAIMS ONLY)
@@ -276,7 +660,9 @@ class LLMClient:
         
         if model_config.get("two_stage"):
             logger.info(f"🏥 [Two-Stage] {sector} sector using two-stage pipeline")
-            return self._analyze_two_stage(sector, data, rag_context, model_config)
+            result = self._analyze_two_stage(sector, data, rag_context, model_config)
+            self._store_cached_response(cache_key, result)
+            return result
 
         # ============================================================
         # UNIVERSAL FRAUD PRE-CHECKS (ALL INDUSTRIES)
@@ -339,8 +725,7 @@ class LLMClient:
                 base_score = 75  # HIGH risk base for OFAC
                 score_bonus = min(red_flags_count * 5, 20)  # Up to +20 for additional flags
                 fraud_score = min(base_score + score_bonus, 100)
-                
-                risk_level = "HIGH" if fraud_score < 85 else "CRITICAL"
+                risk_level = get_risk_level(fraud_score)
                 
                 countries_str = ", ".join(ofac_countries)
                 reasoning = f"⚠️ CRITICAL: OFAC SANCTIONED/HIGH-RISK COUNTRY DETECTED - {countries_str}. " \
@@ -367,64 +752,170 @@ class LLMClient:
         # Build prompt based on sector, including RAG context
         prompt = build_prompt(sector, data, rag_context)
 
-        # Build ordered list: primary + fallbacks
-        candidates: List[Dict[str, str]] = [model_config["primary"]]
-        candidates.extend(model_config.get("fallbacks", []))
-
-        for idx, cfg in enumerate(candidates):
-            provider = cfg.get("provider")
-            model_name = cfg.get("model")
-
-            if not provider or not model_name:
-                continue
+        if self._semantic_cache is not None:
+            similar = self._semantic_cache.lookup(sector, prompt)
+            if similar is not None:
+                return similar
 
-            is_fallback = (idx > 0)
-            fallback_number = idx if is_fallback else None
-
-            # Log fallback attempts
-            if is_fallback:
-                logger.warning(f"⚠️  Primary model failed, trying fallback #{fallback_number}: {provider} - {model_name}")
-            else:
-                logger.info(f"Calling {provider} model: {model_name} for sector: {sector}")
-
-            if provider == "hf":
-                result = self._try_hf_model(
-                    model_name,
-                    prompt,
-                    sector,
-                    data,
-                    hf_provider=cfg.get("hf_provider"),
-                )
-            elif provider == "openrouter":
-                result = self._try_openrouter_model(model_name, prompt, sector, data)
-            elif provider == "vertex":
-                result = self._try_vertex_model(model_name, prompt, sector, data)
-            else:
-                logger.error(f"Unknown provider '{provider}' for model {model_name}")
-                result = None
+        # Ordered primary + fallbacks, precomputed at import
+        candidates = _SECTOR_CANDIDATES[sector]
 
+        for idx, cfg, result in self._iter_candidate_results(candidates, prompt, sector, data):
             if result:
-                # Reject hallucinated default scores so we try the next free-tier model
-                if result.get("score_parsed") is False:
-                    logger.warning(
-                        f"⚠️  {provider}/{model_name} returned unparsed score — trying next model"
-                    )
-                    result = None
-                else:
-                    result["model_used"] = format_model_name(
-                        model_name, provider, is_fallback, fallback_number
+                provider = cfg.get("provider")
+                model_name = cfg.get("model")
+                is_fallback = (idx > 0)
+                fallback_number = idx if is_fallback else None
+                result["model_used"] = format_model_name(
+                    model_name, provider, is_fallback, fallback_number
+                )
+                result["provider"] = provider
+                if is_fallback:
+                    logger.info(
+                        f"✅ Fallback #{fallback_number} successful: Using {provider} - {model_name}"
                     )
-                    result["provider"] = provider
-                    if is_fallback:
-                        logger.info(
-                            f"✅ Fallback #{fallback_number} successful: Using {provider} - {model_name}"
-                        )
-                    return result
+                self._store_cached_response(cache_key, result)
+                if self._semantic_cache is not None:
+                    self._semantic_cache.store(sector, prompt, result)
+                return result
 
         # All providers + fallbacks failed, use rule-based scoring
         logger.warning("All LLM providers failed, falling back to rule-based scoring")
         return self._fallback_analysis(sector, data)
 
+    def analyze_fraud_batch(
+        self,
+        sector: str,
+        records: List[Dict[str, Any]],
+        rag_contexts: Optional[List[Optional[str]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Analyze several records concurrently; results are returned in input order.
+
+        Each record runs the full analyze_fraud path (cache, prechecks, fallbacks)
+        on a worker thread, sharing the pooled HTTP connections, so a batch costs
+        roughly the slowest call instead of the sum of all calls. Prompts are not
+        merged into one request: a single malformed reply would then fail every record.
+        """
+        if sector not in SECTOR_MODELS:
+            raise ValueError(f"Unknown sector: {sector}")
+        if rag_contexts is None:
+            rag_contexts = [None] * len(records)
+        elif len(rag_contexts) != len(records):
+            raise ValueError("rag_contexts must match records in length")
+        if not records:
+            return []
+
+        workers = min(LLM_BATCH_CONCURRENCY, len(records))
+        if workers == 1:
+            return [
+                self.analyze_fraud(sector, record, rag_context=rag_context)
+                for record, rag_context in zip(records, rag_contexts)
+            ]
+        # Own pool: batch workers may block on hedged calls in self._hedge_pool.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as pool:
+            futures = [
+                pool.submit(self.analyze_fraud, sector, record, rag_context)
+                for record, rag_context in zip(records, rag_contexts)
+            ]
+            return [future.result() for future in futures]
+
+    def _call_candidate(
+        self, cfg: Dict[str, str], prompt: str, sector: str, data: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Run one single-stage candidate; unparsed scores count as failures."""
+        provider = cfg.get("provider")
+        model_name = cfg.get("model")
+        if provider == "hf":
+            result = self._guarded_call(
+                provider,
+                model_name,
+                self._try_hf_model,
+                model_name,
+                prompt,
+                sector,
+                data,
+                hf_provider=cfg.get("hf_provider"),
+            )
+        elif provider == "openrouter":
+            result = self._guarded_call(
+                provider, model_name, self._try_openrouter_model, model_name, prompt, sector, data
+            )
+        elif provider == "vertex":
+            result = self._try_vertex_model(model_name, prompt, sector, data)
+        else:
+            logger.error(f"Unknown provider '{provider}' for model {model_name}")
+            result = None
+
+        # Reject hallucinated default scores so we try the next free-tier model
+        if result and result.get("score_parsed") is False:
+            logger.warning(f"⚠️  {provider}/{model_name} returned unparsed score — trying next model")
+            return None
+        return result
+
+    def _iter_candidate_results(
+        self,
+        candidates: Tuple[Tuple[int, Dict[str, Any]], ...],
+        prompt: str,
+        sector: str,
+        data: Dict[str, Any],
+    ) -> Iterator[Tuple[int, Dict[str, str], Optional[Dict[str, Any]]]]:
+        """
+        Yield (index, config, result) per candidate attempt, lazily and in order.
+
+        candidates are the sector's precomputed (index, config) pairs.
+        With LLM_HEDGE_DELAY_SECONDS > 0 the primary and first fallback are raced:
+        the fallback starts only if the primary hasn't succeeded within the delay,
+        and the first successful result wins.
+        """
+        if LLM_HEDGE_DELAY_SECONDS > 0 and len(candidates) > 1:
+            yield self._race_hedged(candidates[0], candidates[1], prompt, sector, data)
+            candidates = candidates[2:]
+
+        for idx, cfg in candidates:
+            if idx > 0:
+                logger.warning(
+                    f"⚠️  Primary model failed, trying fallback #{idx}: {cfg['provider']} - {cfg['model']}"
+                )
+            else:
+                logger.info(f"Calling {cfg['provider']} model: {cfg['model']} for sector: {sector}")
+            yield idx, cfg, self._call_candidate(cfg, prompt, sector, data)
+
+    def _race_hedged(
+        self,
+        primary: Tuple[int, Dict[str, str]],
+        hedge: Tuple[int, Dict[str, str]],
+        prompt: str,
+        sector: str,
+        data: Dict[str, Any],
+    ) -> Tuple[int, Dict[str, str], Optional[Dict[str, Any]]]:
+        """Hedged request: primary first, hedge after a delay; first success wins."""
+        hedge_pool = self._get_hedge_pool()
+        logger.info(f"Calling {primary[1]['provider']} model: {primary[1]['model']} for sector: {sector}")
+        primary_future = hedge_pool.submit(self._call_candidate, primary[1], prompt, sector, data)
+        done, _ = wait([primary_future], timeout=LLM_HEDGE_DELAY_SECONDS)
+        if done and primary_future.result():
+            return primary[0], primary[1], primary_future.result()
+
+        logger.warning(
+            f"⚠️  Primary slow or failed — hedging with fallback #{hedge[0]}: "
+            f"{hedge[1]['provider']} - {hedge[1]['model']}"
+        )
+        futures = {
+            primary_future: primary,
+            hedge_pool.submit(self._call_candidate, hedge[1], prompt, sector, data): hedge,
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result:
+                    # The loser can't be interrupted mid-request; its result is discarded.
+                    idx, cfg = futures[future]
+                    return idx, cfg, result
+        return hedge[0], hedge[1], None
+
     # -------------------------
     # Provider-specific helpers
     # -------------------------
@@ -466,35 +957,19 @@ class LLMClient:
         max_retries = 3
         base_delay = 2.0  # Start with 2 seconds
         
-        # Models known to not support chat_completion — go straight to text_generation
-        models_no_chat = [
-            "instruction-pretrain/finance-Llama3-8B",
-            "meta-llama/Llama-3.1-8B-Instruct",
-            "mistralai/Mistral-7B-Instruct-v0.2",
-        ]
-
-        # Models that ONLY support chat_completion — NEVER fall back to text_generation
-        # Qwen3-32B (primary) and Qwen2.5-* (legacy) use the conversational interface only.
-        # MedGemma-27B is also instruction-tuned and chat-only.
-        models_chat_only = [
-            "Qwen",          # matches Qwen/Qwen3-32B, Qwen/Qwen2.5-*, etc.
-            "qwen",
-            "medgemma",      # google/medgemma-27b-text-it
-            "MedGemma",
-        ]
-        
-        skip_chat = any(no_chat in model_name for no_chat in models_no_chat)
-        chat_only = any(chat_only_model in model_name for chat_only_model in models_chat_only)
+        skip_chat, chat_only = _hf_chat_support(model_name)
         
         # Try chat_completion first (unless we know it doesn't work)
         if not skip_chat:
             for attempt in range(max_retries):
+                if not self._acquire_rate_slot("hf"):
+                    return None
                 try:
                     logger.info(f"  → Attempting chat_completion API with {model_name} (attempt {attempt + 1}/{max_retries})...")
                     if hf_provider:
                         # Direct router URL — skips Hub provider-mapping GET (often 429 on Cloud Run)
                         generated_text = self._hf_provider_chat_completion(
-                            model_name, prompt, hf_provider
+                            model_name, prompt, hf_provider, stop_early=not is_clinical_stage
                         )
                     else:
                         messages = [{"role": "user", "content": prompt}]
@@ -504,30 +979,29 @@ class LLMClient:
                             model=model_name,
                             max_tokens=int(hf_defaults.get("max_tokens", 1024)),
                             temperature=float(hf_defaults.get("temperature", 0.2)),
-                            stream=False
+                            stream=LLM_STREAM_RESPONSES
                         )
-                        generated_text = response.choices[0].message.content
+                        if LLM_STREAM_RESPONSES:
+                            generated_text = _collect_hf_chat_stream(response, stop_early=not is_clinical_stage)
+                        else:
+                            generated_text = response.choices[0].message.content
+                            # message.content is Optional; coerce once (None → "None" → unparsed)
+                            if not isinstance(generated_text, str):
+                                generated_text = str(generated_text)
                     
+                    self._record_provider_outcome("hf", rate_limited=False)
                     logger.info(f"✅ HF API success (chat) with {model_name}" + (f" via {hf_provider}" if hf_provider else ""))
                     
                     # Parse the response to extract fraud score and reasoning
-                    parsed = parse_model_response(str(generated_text), sector, data, is_clinical_stage=is_clinical_stage)
+                    parsed = parse_model_response(generated_text, sector, data, is_clinical_stage=is_clinical_stage)
                     if not is_clinical_stage and parsed.get("score_parsed") is False:
                         logger.warning(f"HF {model_name} response could not be scored — skipping")
                         return None
                     return parsed
                 
                 except Exception as chat_error:
-                    # Check for rate limit errors in multiple ways
+                    status_code, retry_after = _error_status(chat_error)
                     error_str = str(chat_error).lower()
-                    error_type = type(chat_error).__name__.lower()
-                    
-                    # Check HTTP status code if available
-                    status_code = None
-                    if hasattr(chat_error, 'status_code'):
-                        status_code = chat_error.status_code
-                    elif hasattr(chat_error, 'response') and hasattr(chat_error.response, 'status_code'):
-                        status_code = chat_error.response.status_code
                     
                     # Log error type only - avoid logging full error (may contain sensitive data)
                     logger.warning(f"⚠️  Chat completion error on attempt {attempt + 1}/{max_retries}: {type(chat_error).__name__}")
@@ -569,18 +1043,12 @@ class LLMClient:
                             logger.debug(f"  → Model {model_name} doesn't support chat_completion (400), using text_generation directly")
                             break  # Skip chat_completion, go to text_generation
                     
-                    is_rate_limit = (
-                        status_code == 429 or
-                        "429" in error_str or
-                        "rate limit" in error_str or
-                        "too many requests" in error_str or
-                        "ratelimit" in error_type or
-                        "rate_limit" in error_type
-                    )
-                    
-                    if is_rate_limit and attempt < max_retries - 1:
-                        # Exponential backoff: 2s, 4s, 8s
-                        delay = base_delay * (2 ** attempt)
+                    chat_rate_limited = _is_rate_limited(chat_error, status_code)
+                    if chat_rate_limited:
+                        self._record_provider_outcome("hf", rate_limited=True)
+                    if chat_rate_limited and attempt < max_retries - 1:
+                        # Exponential backoff (2s, 4s, 8s) with jitter, or the server's Retry-After
+                        delay = _retry_delay(base_delay * (2 ** attempt), retry_after)
                         logger.warning(f"⚠️  Rate limit (429) on attempt {attempt + 1}, retrying in {delay:.1f}s...")
                         time.sleep(delay)
                         continue
@@ -603,60 +1071,40 @@ class LLMClient:
         logger.info(f"  → Using text_generation API with {model_name}...")
         
         for text_attempt in range(max_retries):
+            if not self._acquire_rate_slot("hf"):
+                return None
             try:
                 result = client.text_generation(
                     prompt,
                     model=model_name,
                     max_new_tokens=512,
                     temperature=0.5,  # Lower temperature for more precise, deterministic fraud analysis
-                    return_full_text=False
+                    return_full_text=False,
+                    stream=False,
                 )
-                
-                # Handle generators, strings, and TextGenerationOutput responses
-                import inspect
-                if inspect.isgenerator(result) or hasattr(result, '__iter__') and not isinstance(result, (str, bytes)):
-                    # It's a generator or iterator - consume it
-                    try:
-                        generated_text = ''.join(str(chunk) for chunk in result)
-                    except StopIteration:
-                        # Empty generator
-                        raise ValueError("Model returned empty response")
-                elif hasattr(result, 'generated_text'):
-                    generated_text = result.generated_text
-                elif isinstance(result, str):
+
+                # stream=False returns a str (or TextGenerationOutput when details are requested)
+                if isinstance(result, str):
                     generated_text = result
                 else:
-                    generated_text = str(result)
+                    generated_text = getattr(result, "generated_text", None) or result
+                    if not isinstance(generated_text, str):
+                        generated_text = str(generated_text)
                 
+                self._record_provider_outcome("hf", rate_limited=False)
                 logger.info(f"✅ HF API success (text_generation) with {model_name}")
                 
                 # Parse the response to extract fraud score and reasoning
-                parsed = parse_model_response(str(generated_text), sector, data, is_clinical_stage=is_clinical_stage)
+                parsed = parse_model_response(generated_text, sector, data, is_clinical_stage=is_clinical_stage)
                 return parsed
             
             except Exception as text_error:
-                # Check for rate limit errors in multiple ways
-                text_error_str = str(text_error).lower()
-                text_error_type = type(text_error).__name__.lower()
-                
-                # Check HTTP status code if available
-                text_status_code = None
-                if hasattr(text_error, 'status_code'):
-                    text_status_code = text_error.status_code
-                elif hasattr(text_error, 'response') and hasattr(text_error.response, 'status_code'):
-                    text_status_code = text_error.response.status_code
-                
-                is_text_rate_limit = (
-                    text_status_code == 429 or
-                    "429" in text_error_str or
-                    "rate limit" in text_error_str or
-                    "too many requests" in text_error_str or
-                    "ratelimit" in text_error_type or
-                    "rate_limit" in text_error_type
-                )
-                
-                if is_text_rate_limit and text_attempt < max_retries - 1:
-                    delay = base_delay * (2 ** text_attempt)
+                text_status_code, text_retry_after = _error_status(text_error)
+                text_rate_limited = _is_rate_limited(text_error, text_status_code)
+                if text_rate_limited:
+                    self._record_provider_outcome("hf", rate_limited=True)
+                if text_rate_limited and text_attempt < max_retries - 1:
+                    delay = _retry_delay(base_delay * (2 ** text_attempt), text_retry_after)
                     logger.warning(f"⚠️  Rate limit (429) on text_generation attempt {text_attempt + 1}, retrying in {delay:.1f}s...")
                     time.sleep(delay)
                     continue
@@ -677,6 +1125,7 @@ class LLMClient:
         sector: str,
         data: Dict[str, Any],
         *,
+        is_clinical_stage: bool = False,
         max_retries: int = 2,
     ) -> Optional[Dict[str, Any]]:
         """Call OpenRouter free/paid chat models with enough budget for reasoning models."""
@@ -708,12 +1157,15 @@ class LLMClient:
         max_retries = max(1, min(int(max_retries), 3))
 
         for attempt in range(max_retries):
+            if not self._acquire_rate_slot("openrouter"):
+                return None
             try:
-                resp = httpx.post(
+                resp, streamed = self._post_chat(
                     "https://openrouter.ai/api/v1/chat/completions",
-                    headers=headers,
-                    json=payload,
-                    timeout=timeout,
+                    headers,
+                    payload,
+                    timeout,
+                    stop_early=not is_clinical_stage,
                 )
                 if resp.status_code in (402, 404):
                     # Free slug removed / payment required — skip without retry noise
@@ -728,11 +1180,8 @@ class LLMClient:
                     return None
 
                 if resp.status_code == 429:
-                    retry_after = resp.headers.get("Retry-After")
-                    try:
-                        delay = float(retry_after) if retry_after else min(1.5 * (attempt + 1), 4.0)
-                    except ValueError:
-                        delay = min(1.5 * (attempt + 1), 4.0)
+                    self._record_provider_outcome("openrouter", rate_limited=True)
+                    delay = _retry_delay(min(1.5 * (attempt + 1), 4.0), _parse_retry_after(resp.headers))
                     if attempt < max_retries - 1:
                         logger.warning(
                             f"⚠️  OpenRouter 429 for {model_name} "
@@ -749,7 +1198,8 @@ class LLMClient:
                     return None
 
                 resp.raise_for_status()
-                data_json = resp.json()
+                self._record_provider_outcome("openrouter", rate_limited=False)
+                data_json = streamed if streamed is not None else _json_body(resp.content)
                 choices = data_json.get("choices") or []
                 if not choices:
                     logger.error(f"OpenRouter returned no choices for model {model_name}")
@@ -775,7 +1225,11 @@ class LLMClient:
                     logger.error(f"OpenRouter empty content for {model_name} (finish={finish_reason})")
                     return None
 
-                if finish_reason == "length" and "RISK_LEVEL" not in generated_text.upper():
+                if (
+                    finish_reason == "length"
+                    and not is_clinical_stage
+                    and "RISK_LEVEL" not in generated_text.upper()
+                ):
                     logger.warning(
                         f"OpenRouter truncated {model_name} before structured output "
                         f"(reasoning_tokens={reasoning_tokens}); trying next model"
@@ -788,16 +1242,20 @@ class LLMClient:
                     f"content_len={len(generated_text)})"
                 )
 
-                parsed = parse_model_response(str(generated_text), sector, data)
-                if parsed.get("score_parsed") is False:
+                parsed = parse_model_response(
+                    generated_text, sector, data, is_clinical_stage=is_clinical_stage
+                )
+                if not is_clinical_stage and parsed.get("score_parsed") is False:
                     logger.warning(f"OpenRouter {model_name} response could not be scored — skipping")
                     return None
                 return parsed
 
             except httpx.HTTPStatusError as e:
-                status = e.response.status_code if e.response is not None else None
+                status, retry_after = _error_status(e)
+                if status == 429:
+                    self._record_provider_outcome("openrouter", rate_limited=True)
                 if status == 429 and attempt < max_retries - 1:
-                    delay = min(1.5 * (attempt + 1), 4.0)
+                    delay = _retry_delay(min(1.5 * (attempt + 1), 4.0), retry_after)
                     logger.warning(
                         f"⚠️  OpenRouter HTTP 429 for {model_name} "
                         f"(attempt {attempt + 1}/{max_retries}), retrying in {delay:.1f}s..."
@@ -819,8 +1277,6 @@ class LLMClient:
         if not self.api_token:
             return
         try:
-            from huggingface_hub import HfApi
-
             logger.info(f"  → Waking HF Space {space_name} (restart_space)...")
             HfApi(token=self.api_token).restart_space(space_name, factory_reboot=False)
             time.sleep(8)
@@ -854,6 +1310,9 @@ class LLMClient:
             logger.info("  → Install: pip install gradio_client")
             return None
         
+        if not self._acquire_rate_slot("hf_space"):
+            return None
+
         try:
             logger.info(f"  → Calling HF Space: {space_name}")
             
@@ -1089,11 +1548,14 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
             if stage1_config["provider"] == "medgemma_local":
                 # Local Mac Mini MedGemma (ngrok). Maps audit JSON → Stage 1 dict.
                 # Failures return None → same stage1_optional / fallback semantics as HF.
-                from .medgemma_local import try_audit_claim
-
-                stage1_result = try_audit_claim(data)
+                stage1_result = self._guarded_call(
+                    "medgemma_local", stage1_config["model"], medgemma_local.try_audit_claim, data
+                )
             elif stage1_config["provider"] == "hf_space":
-                stage1_result = self._try_hf_space_model(
+                stage1_result = self._guarded_call(
+                    "hf_space",
+                    stage1_config["model"],
+                    self._try_hf_space_model,
                     stage1_config["model"],
                     data,
                     sector,
@@ -1101,7 +1563,10 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
                     space_api_name=stage1_config.get("space_api_name"),
                 )
             elif stage1_config["provider"] == "hf":
-                stage1_result = self._try_hf_model(
+                stage1_result = self._guarded_call(
+                    "hf",
+                    stage1_config["model"],
+                    self._try_hf_model,
                     stage1_config["model"],
                     stage1_prompt,
                     sector,
@@ -1110,7 +1575,16 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
                     hf_provider=stage1_config.get("hf_provider"),
                 )
             elif stage1_config["provider"] == "openrouter":
-                stage1_result = self._try_openrouter_model(stage1_config["model"], stage1_prompt, sector, data)
+                stage1_result = self._guarded_call(
+                    "openrouter",
+                    stage1_config["model"],
+                    self._try_openrouter_model,
+                    stage1_config["model"],
+                    stage1_prompt,
+                    sector,
+                    data,
+                    is_clinical_stage=True,
+                )
             elif stage1_config["provider"] == "vertex":
                 stage1_result = self._try_vertex_model(stage1_config["model"], stage1_prompt, sector, data)
             else:
@@ -1188,7 +1662,10 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
         # Try Stage 2 model
         try:
             if stage2_config["provider"] == "hf":
-                stage2_result = self._try_hf_model(
+                stage2_result = self._guarded_call(
+                    "hf",
+                    stage2_config["model"],
+                    self._try_hf_model,
                     stage2_config["model"],
                     stage2_prompt,
                     sector,
@@ -1197,8 +1674,15 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
                 )
             elif stage2_config["provider"] == "openrouter":
                 # Fail fast on free-tier 429 — don't sit in long backoff after local Stage 1.
-                stage2_result = self._try_openrouter_model(
-                    stage2_config["model"], stage2_prompt, sector, data, max_retries=1
+                stage2_result = self._guarded_call(
+                    "openrouter",
+                    stage2_config["model"],
+                    self._try_openrouter_model,
+                    stage2_config["model"],
+                    stage2_prompt,
+                    sector,
+                    data,
+                    max_retries=1,
                 )
             else:
                 stage2_result = None
@@ -1333,8 +1817,6 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
         Keep a successful local MedGemma Stage 1 when Stage 2 LLMs are rate-limited.
         Blend clinical legitimacy with deterministic billing rules into a usable score.
         """
-        from app.llm.chains import score_with_breakdown
-
         rule_score, breakdown = score_with_breakdown(sector, data)
         try:
             clinical_score = float(clinical_score)
@@ -1443,7 +1925,10 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
             logger.warning(f"⚠️  Trying fallback #{idx + 1}: {provider} - {model_name}")
             
             if provider == "hf":
-                result = self._try_hf_model(
+                result = self._guarded_call(
+                    provider,
+                    model_name,
+                    self._try_hf_model,
                     model_name,
                     prompt,
                     sector,
@@ -1451,7 +1936,10 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
                     hf_provider=fallback_cfg.get("hf_provider"),
                 )
             elif provider == "openrouter":
-                result = self._try_openrouter_model(
+                result = self._guarded_call(
+                    provider,
+                    model_name,
+                    self._try_openrouter_model,
                     model_name,
                     prompt,
                     sector,
@@ -1484,9 +1972,24 @@ Provider History: {data.get('provider_history', 'Unknown')}"""
         }
     
     def _fallback_analysis(self, sector: str, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Rule-based fallback when API fails"""
+        """Rule-based fallback when API fails (memoised: the rules are deterministic)"""
+        key = self._response_cache_key(sector, data, None)
+        with self._response_cache_lock:
+            cached = self._rule_fallback_cache.get(key)
+            if cached is not None:
+                self._rule_fallback_cache.move_to_end(key)
+        if cached is not None:
+            logger.info(f"Using cached rule-based fallback for sector: {sector}")
+            return copy.deepcopy(cached)
+
         logger.info(f"Using rule-based fallback for sector: {sector}")
 
         from app.core import analyze_fraud_rule_based
-        return analyze_fraud_rule_based(sector, data)
+        result = analyze_fraud_rule_based(sector, data)
+        entry = copy.deepcopy(result)
+        with self._response_cache_lock:
+            self._rule_fallback_cache[key] = entry
+            if len(self._rule_fallback_cache) > _RULE_FALLBACK_CACHE_SIZE:
+                self._rule_fallback_cache.popitem(last=False)
+        return result
 
@@ -1,30 +1,12 @@
 """Banking fraud detection prompts."""
 from typing import Dict, Any, Optional
 
-from .base_prompts import build_rag_section
+from .base_prompts import build_rag_section, prompt_fields
 from app.llm.ofac import build_ofac_risk_warning
 
 
-def build_banking_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
-    """Build fraud detection prompt for banking/crypto sector."""
-    rag_section = build_rag_section(rag_context)
-    ofac_warning = build_ofac_risk_warning(data, ['source_country', 'destination_country', 'location'])
-
-    ip_address = str(data.get('ip_address', '')).lower()
-    vpn_risk = ""
-    if 'vpn' in ip_address or 'proxy' in ip_address or 'tor' in ip_address:
-        vpn_risk = "⚠️ WARNING: VPN/Proxy/TOR detected - This is a HIGH-RISK indicator for fraud!"
-
-    wallet_info = ""
-    if data.get('sender_wallet') or data.get('receiver_wallet'):
-        wallet_info = f"""
-Blockchain Details (Crypto Transaction):
-- Sender Wallet: {data.get('sender_wallet', 'N/A')}
-- Receiver Wallet: {data.get('receiver_wallet', 'N/A')}
-- Note: Check wallet addresses against known fraud databases and Etherscan for transaction history
-"""
-
-    return f"""You are a senior financial fraud analyst with 15 years of experience. Analyze this transaction and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
+# Static prompt text; per-request values are filled with str.format_map().
+_BANKING_PROMPT_TEMPLATE = """You are a senior financial fraud analyst with 15 years of experience. Analyze this transaction and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
 
 {rag_section}
 
@@ -32,16 +14,16 @@ CRITICAL FRAUD INDICATORS TO EVALUATE:
 {ofac_warning}{vpn_risk}
 
 Transaction Details:
-- Transaction ID: {data.get('transaction_id')}
-- Type: {data.get('transaction_type')}
-- Amount: ${data.get('amount')}
-- Source Country: {data.get('source_country')}
-- Destination Country: {data.get('destination_country')}
-- Account Age: {data.get('account_age_days')} days (NEW accounts < 90 days are HIGH RISK)
-- KYC Verified: {data.get('kyc_verified')} (FALSE = HIGH RISK)
-- Previously Flagged: {data.get('previously_flagged')}
-- Transaction Velocity: {data.get('transaction_velocity', 'N/A')} transactions in 24h
-- IP Address: {data.get('ip_address', 'N/A')}
+- Transaction ID: {transaction_id}
+- Type: {transaction_type}
+- Amount: ${amount}
+- Source Country: {source_country}
+- Destination Country: {destination_country}
+- Account Age: {account_age_days} days (NEW accounts < 90 days are HIGH RISK)
+- KYC Verified: {kyc_verified} (FALSE = HIGH RISK)
+- Previously Flagged: {previously_flagged}
+- Transaction Velocity: {transaction_velocity} transactions in 24h
+- IP Address: {ip_address}
 {wallet_info}
 
 SCORING GUIDELINES (STRICT - be conservative and flag suspicious transactions):
@@ -67,3 +49,38 @@ SCORE CALIBRATION (mandatory — ignore these and your response will be discarde
 - Your FRAUD_SCORE MUST numerically reflect every risk factor you list
 - FRAUD_SCORE: 50 when you identified multiple clear red flags is WRONG
 """
+
+# Fields rendered with a default other than None when absent from the data
+_BANKING_FIELD_DEFAULTS = {
+    'transaction_velocity': 'N/A',
+    'ip_address': 'N/A',
+}
+
+
+def build_banking_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
+    """Build fraud detection prompt for banking/crypto sector."""
+    rag_section = build_rag_section(rag_context)
+    ofac_warning = build_ofac_risk_warning(data, ['source_country', 'destination_country', 'location'])
+
+    ip_address = str(data.get('ip_address', '')).lower()
+    vpn_risk = ""
+    if 'vpn' in ip_address or 'proxy' in ip_address or 'tor' in ip_address:
+        vpn_risk = "⚠️ WARNING: VPN/Proxy/TOR detected - This is a HIGH-RISK indicator for fraud!"
+
+    wallet_info = ""
+    if data.get('sender_wallet') or data.get('receiver_wallet'):
+        wallet_info = f"""
+Blockchain Details (Crypto Transaction):
+- Sender Wallet: {data.get('sender_wallet', 'N/A')}
+- Receiver Wallet: {data.get('receiver_wallet', 'N/A')}
+- Note: Check wallet addresses against known fraud databases and Etherscan for transaction history
+"""
+
+    return _BANKING_PROMPT_TEMPLATE.format_map(prompt_fields(
+        _BANKING_FIELD_DEFAULTS,
+        data,
+        rag_section=rag_section,
+        ofac_warning=ofac_warning,
+        vpn_risk=vpn_risk,
+        wallet_info=wallet_info,
+    ))
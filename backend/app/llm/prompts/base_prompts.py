@@ -1,5 +1,25 @@
 """Base prompt utilities and RAG context formatting."""
-from typing import Optional
+from typing import Any, Dict, Optional
+
+
+class PromptFields(dict):
+    """
+    str.format_map() mapping for the static sector templates.
+
+    Absent keys render as None, exactly like the f-string data.get(key) it replaces;
+    fields with another default are seeded before the transaction data is merged in.
+    """
+
+    def __missing__(self, key: str) -> None:
+        return None
+
+
+def prompt_fields(defaults: Dict[str, Any], data: Dict[str, Any], **computed: Any) -> PromptFields:
+    """Merge field defaults, transaction data, then computed sections (highest precedence)."""
+    fields = PromptFields(defaults)
+    fields.update(data)
+    fields.update(computed)
+    return fields
 
 
 def build_rag_section(rag_context: Optional[str]) -> str:
@@ -1,42 +1,12 @@
 """E-commerce fraud detection prompts."""
 from typing import Dict, Any, Optional
 
-from .base_prompts import build_rag_section
+from .base_prompts import build_rag_section, prompt_fields
 from app.llm.ofac import build_ofac_risk_warning
 
 
-def build_ecommerce_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
-    """Build fraud detection prompt for e-commerce sector."""
-    rag_section = build_rag_section(rag_context)
-
-    price = float(data.get('price', data.get('amount', 0)) or 0)
-    amount = float(data.get('amount', data.get('price', 0)) or 0)
-    market_price = float(data.get('market_price', 0) or 0)
-    price_discrepancy = ""
-    if market_price > 0 and price > 0:
-        discount_pct = ((market_price - price) / market_price) * 100
-        if discount_pct > 50:
-            price_discrepancy = f"⚠️ CRITICAL: Listed price is {discount_pct:.1f}% below market price (${price} vs ${market_price}) - MAJOR RED FLAG!"
-        elif discount_pct > 30:
-            price_discrepancy = f"⚠️ WARNING: Listed price is {discount_pct:.1f}% below market price (${price} vs ${market_price})"
-    if price > 0 and amount > 0 and price != amount:
-        price_diff_pct = abs((price - amount) / max(price, amount)) * 100
-        if price_diff_pct > 50:
-            price_discrepancy += f"\n⚠️ CRITICAL: Listed price (${price}) differs significantly from order amount (${amount}) - This is suspicious!"
-
-    ofac_warning = build_ofac_risk_warning(data, ['shipping_location', 'shipping_address', 'billing_address', 'origin_country'])
-
-    ip_address = str(data.get('ip_address', '')).lower()
-    vpn_risk = "⚠️ WARNING: VPN/Proxy/TOR detected - This is a HIGH-RISK indicator for fraud!" if ('vpn' in ip_address or 'proxy' in ip_address or 'tor' in ip_address) else ""
-
-    email_risk = "⚠️ WARNING: Email NOT verified - Unverified accounts are HIGH-RISK for fraud!" if not data.get('email_verified', False) else ""
-
-    reviews = str(data.get('reviews', ''))
-    review_risk = ""
-    if any(kw in reviews.lower() for kw in ['scam', 'fraud', 'illegal', 'fake', 'counterfeit', 'do not buy', 'sanction', 'warning']):
-        review_risk = "⚠️ CRITICAL: Reviews contain fraud warnings (scam, illegal, fake, etc.) - This is a MAJOR RED FLAG!"
-
-    return f"""You are a senior e-commerce fraud prevention specialist with expertise in online marketplace scams. Analyze this transaction and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
+# Static prompt text; per-request values are filled with str.format_map().
+_ECOMMERCE_PROMPT_TEMPLATE = """You are a senior e-commerce fraud prevention specialist with expertise in online marketplace scams. Analyze this transaction and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
 
 {rag_section}
 
@@ -47,19 +17,19 @@ CRITICAL FRAUD INDICATORS TO EVALUATE:
 {review_risk}
 
 Transaction Details:
-- Order ID: {data.get('order_id')}
-- Seller Age: {data.get('seller_age_days', 'N/A')} days (NEW sellers < 90 days are HIGH RISK)
-- Listed Price: ${data.get('price', data.get('amount', 'N/A'))}
-- Market Price: ${data.get('market_price', 'N/A')}
-- Order Amount: ${data.get('amount', data.get('price', 'N/A'))}
-- Shipping Address: {data.get('shipping_address', 'N/A')}
-- Billing Address: {data.get('billing_address', 'N/A')}
-- Payment Method: {data.get('payment_method', 'N/A')}
-- IP Address: {data.get('ip_address', 'N/A')}
-- Email Verified: {data.get('email_verified', False)} (FALSE = HIGH RISK)
-- Reviews: {data.get('reviews', 'N/A')}
-- Shipping Location: {data.get('shipping_location', 'N/A')}
-- Product Details: {data.get('product_details', 'N/A')}
+- Order ID: {order_id}
+- Seller Age: {seller_age_days} days (NEW sellers < 90 days are HIGH RISK)
+- Listed Price: ${listed_price}
+- Market Price: ${market_price}
+- Order Amount: ${order_total}
+- Shipping Address: {shipping_address}
+- Billing Address: {billing_address}
+- Payment Method: {payment_method}
+- IP Address: {ip_address}
+- Email Verified: {email_verified} (FALSE = HIGH RISK)
+- Reviews: {reviews}
+- Shipping Location: {shipping_location}
+- Product Details: {product_details}
 
 SCORING GUIDELINES (STRICT - be conservative and flag suspicious transactions):
 - OFAC sanctioned/high-risk countries: Add 40-60 points (CRITICAL if combined with other flags)
@@ -84,3 +54,62 @@ SCORE CALIBRATION (mandatory — ignore these and your response will be discarde
 - Your FRAUD_SCORE MUST numerically reflect every risk factor you list
 - FRAUD_SCORE: 50 when you identified multiple clear red flags is WRONG
 """
+
+# Fields rendered with a default other than None when absent from the data
+_ECOMMERCE_FIELD_DEFAULTS = {
+    'seller_age_days': 'N/A',
+    'market_price': 'N/A',
+    'shipping_address': 'N/A',
+    'billing_address': 'N/A',
+    'payment_method': 'N/A',
+    'ip_address': 'N/A',
+    'email_verified': False,
+    'reviews': 'N/A',
+    'shipping_location': 'N/A',
+    'product_details': 'N/A',
+}
+
+
+def build_ecommerce_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
+    """Build fraud detection prompt for e-commerce sector."""
+    rag_section = build_rag_section(rag_context)
+
+    price = float(data.get('price', data.get('amount', 0)) or 0)
+    amount = float(data.get('amount', data.get('price', 0)) or 0)
+    market_price = float(data.get('market_price', 0) or 0)
+    price_discrepancy = ""
+    if market_price > 0 and price > 0:
+        discount_pct = ((market_price - price) / market_price) * 100
+        if discount_pct > 50:
+            price_discrepancy = f"⚠️ CRITICAL: Listed price is {discount_pct:.1f}% below market price (${price} vs ${market_price}) - MAJOR RED FLAG!"
+        elif discount_pct > 30:
+            price_discrepancy = f"⚠️ WARNING: Listed price is {discount_pct:.1f}% below market price (${price} vs ${market_price})"
+    if price > 0 and amount > 0 and price != amount:
+        price_diff_pct = abs((price - amount) / max(price, amount)) * 100
+        if price_diff_pct > 50:
+            price_discrepancy += f"\n⚠️ CRITICAL: Listed price (${price}) differs significantly from order amount (${amount}) - This is suspicious!"
+
+    ofac_warning = build_ofac_risk_warning(data, ['shipping_location', 'shipping_address', 'billing_address', 'origin_country'])
+
+    ip_address = str(data.get('ip_address', '')).lower()
+    vpn_risk = "⚠️ WARNING: VPN/Proxy/TOR detected - This is a HIGH-RISK indicator for fraud!" if ('vpn' in ip_address or 'proxy' in ip_address or 'tor' in ip_address) else ""
+
+    email_risk = "⚠️ WARNING: Email NOT verified - Unverified accounts are HIGH-RISK for fraud!" if not data.get('email_verified', False) else ""
+
+    reviews = str(data.get('reviews', ''))
+    review_risk = ""
+    if any(kw in reviews.lower() for kw in ['scam', 'fraud', 'illegal', 'fake', 'counterfeit', 'do not buy', 'sanction', 'warning']):
+        review_risk = "⚠️ CRITICAL: Reviews contain fraud warnings (scam, illegal, fake, etc.) - This is a MAJOR RED FLAG!"
+
+    return _ECOMMERCE_PROMPT_TEMPLATE.format_map(prompt_fields(
+        _ECOMMERCE_FIELD_DEFAULTS,
+        data,
+        rag_section=rag_section,
+        ofac_warning=ofac_warning,
+        price_discrepancy=price_discrepancy,
+        vpn_risk=vpn_risk,
+        email_risk=email_risk,
+        review_risk=review_risk,
+        listed_price=data.get('price', data.get('amount', 'N/A')),
+        order_total=data.get('amount', data.get('price', 'N/A')),
+    ))
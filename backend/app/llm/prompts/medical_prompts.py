@@ -1,16 +1,12 @@
 """Medical fraud detection prompts (single-stage and two-stage)."""
 from typing import Dict, Any, Optional, List
 
-from .base_prompts import build_rag_section
+from .base_prompts import build_rag_section, prompt_fields
 from app.llm.ofac import build_ofac_risk_warning
 
 
-def build_medical_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
-    """Build single-stage fraud detection prompt for medical claims."""
-    rag_section = build_rag_section(rag_context)
-    ofac_warning = build_ofac_risk_warning(data, ['provider_location', 'patient_location', 'billing_address', 'service_location'])
-
-    return f"""You are a senior healthcare fraud investigator with 15 years of experience in medical billing fraud. Analyze this claim and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
+# Static prompt text; per-request values are filled with str.format_map().
+_MEDICAL_PROMPT_TEMPLATE = """You are a senior healthcare fraud investigator with 15 years of experience in medical billing fraud. Analyze this claim and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
 
 {rag_section}
 
@@ -18,15 +14,15 @@ CRITICAL FRAUD INDICATORS TO EVALUATE:
 {ofac_warning}
 
 Claim Details:
-- Claim ID: {data.get('claim_id')}
-- Patient Age: {data.get('patient_age')}
-- Provider ID: {data.get('provider_id')}
-- Specialty: {data.get('specialty')}
-- Diagnosis Codes: {data.get('diagnosis_codes')}
-- Procedure Codes: {data.get('procedure_codes')}
-- Claim Amount: ${data.get('claim_amount')}
-- Provider History: {data.get('provider_history')}
-- Claim Details: {data.get('claim_details')}
+- Claim ID: {claim_id}
+- Patient Age: {patient_age}
+- Provider ID: {provider_id}
+- Specialty: {specialty}
+- Diagnosis Codes: {diagnosis_codes}
+- Procedure Codes: {procedure_codes}
+- Claim Amount: ${claim_amount}
+- Provider History: {provider_history}
+- Claim Details: {claim_details}
 
 SCORING GUIDELINES (STRICT - be conservative and flag suspicious claims):
 - OFAC sanctioned/high-risk countries: Add 40-60 points (CRITICAL if combined with other flags)
@@ -42,7 +38,7 @@ REQUIRED OUTPUT — use EXACTLY this format, no deviations:
 FRAUD_SCORE: [integer 0-100, NOT a percentage sign, NOT a range]
 RISK_LEVEL: [LOW | MEDIUM | HIGH | CRITICAL]
 RISK_FACTORS: upcoding pattern, flagged provider history, excessive claim amount, diagnosis-procedure mismatch
-REASONING: [3-4 complete sentences citing ALL red flags: the claim amount (${data.get('claim_amount')}), the procedure codes ({data.get('procedure_codes')}), diagnosis codes ({data.get('diagnosis_codes')}), and any location-based risks. Be thorough and specific.]
+REASONING: [3-4 complete sentences citing ALL red flags: the claim amount (${claim_amount}), the procedure codes ({procedure_codes}), diagnosis codes ({diagnosis_codes}), and any location-based risks. Be thorough and specific.]
 
 SCORE CALIBRATION (mandatory — ignore these and your response will be discarded):
 - 3 or more red flags present → FRAUD_SCORE must be 70-100 (HIGH or CRITICAL)
@@ -55,22 +51,43 @@ SCORE CALIBRATION (mandatory — ignore these and your response will be discarde
   Correct: that combination demands FRAUD_SCORE >= 70.
 """
 
+# Every field in this template renders as None when absent
+_MEDICAL_FIELD_DEFAULTS: Dict[str, Any] = {}
+
+
+def build_medical_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
+    """Build single-stage fraud detection prompt for medical claims."""
+    rag_section = build_rag_section(rag_context)
+    ofac_warning = build_ofac_risk_warning(data, ['provider_location', 'patient_location', 'billing_address', 'service_location'])
+
+    return _MEDICAL_PROMPT_TEMPLATE.format_map(prompt_fields(
+        _MEDICAL_FIELD_DEFAULTS,
+        data,
+        rag_section=rag_section,
+        ofac_warning=ofac_warning,
+    ))
+
+
+def _claim_codes(data: Dict[str, Any], plural_key: str, singular_key: str):
+    """Claim codes from the list field, else the single-code field; comma strings are split."""
+    codes = data.get(plural_key, [])
+    if not codes:
+        codes = [data.get(singular_key, 'Unknown')]
+    if isinstance(codes, str):
+        codes = [c.strip() for c in codes.split(',') if c.strip()]
+    return codes
+
+
+def _codes_str(codes) -> str:
+    return ', '.join(codes) if codes else 'Unknown'
+
 
 def build_stage1_clinical_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
     """Build Stage 1 prompt for clinical legitimacy validation (MedGemma)."""
-    diag = data.get('diagnosis_codes', [])
-    if not diag:
-        diag = [data.get('diagnosis_code', 'Unknown')]
-    if isinstance(diag, str):
-        diag = [d.strip() for d in diag.split(',') if d.strip()]
-    diag_str = ', '.join(diag) if diag else 'Unknown'
-
-    proc = data.get('procedure_codes', [])
-    if not proc:
-        proc = [data.get('procedure_code', 'Unknown')]
-    if isinstance(proc, str):
-        proc = [p.strip() for p in proc.split(',') if p.strip()]
-    proc_str = ', '.join(proc) if proc else 'Unknown'
+    diag_str = _codes_str(_claim_codes(data, 'diagnosis_codes', 'diagnosis_code'))
+    proc = _claim_codes(data, 'procedure_codes', 'procedure_code')
+    proc_str = _codes_str(proc)
+    specialty = data.get('provider_specialty') or data.get('specialty', 'Unknown')
 
     prompt = f"""You are a medical expert AI tasked with validating the CLINICAL LEGITIMACY of a medical claim.
 Your job is to assess if the medical procedures, diagnoses, and treatments are medically coherent and clinically plausible.
@@ -83,7 +100,7 @@ Medical Claim Details:
 - Patient Age: {data.get('patient_age', 'Unknown')} years
 - Patient Gender: {data.get('gender', 'Unknown')}
 - Provider ID: {data.get('provider_id', 'Unknown')}
-- Provider Specialty: {data.get('provider_specialty') or data.get('specialty', 'Unknown')}
+- Provider Specialty: {specialty}
 - Diagnosis Codes (ICD-10): {diag_str}
 - Procedure Codes (CPT): {proc_str}
 - Claim Amount: ${data.get('claim_amount', 0):,.2f}
@@ -133,19 +150,10 @@ def build_stage2_fraud_prompt(
     clinical_flags: List[str]
 ) -> str:
     """Build Stage 2 prompt for fraud pattern analysis (Nemotron-Super)."""
-    diag = data.get('diagnosis_codes', [])
-    if not diag:
-        diag = [data.get('diagnosis_code', 'Unknown')]
-    if isinstance(diag, str):
-        diag = [d.strip() for d in diag.split(',') if d.strip()]
-    diag_str = ', '.join(diag) if diag else 'Unknown'
-
-    proc = data.get('procedure_codes', [])
-    if not proc:
-        proc = [data.get('procedure_code', 'Unknown')]
-    if isinstance(proc, str):
-        proc = [p.strip() for p in proc.split(',') if p.strip()]
-    proc_str = ', '.join(proc) if proc else 'Unknown'
+    diag_str = _codes_str(_claim_codes(data, 'diagnosis_codes', 'diagnosis_code'))
+    proc = _claim_codes(data, 'procedure_codes', 'procedure_code')
+    proc_str = _codes_str(proc)
+    specialty = data.get('provider_specialty') or data.get('specialty', 'Unknown')
     num_services = len(proc) if isinstance(proc, list) else (len(proc.split(',')) if isinstance(proc, str) else data.get('num_services', 1))
 
     prompt = f"""You are a medical fraud detection AI expert. You have received a clinical legitimacy assessment from a medical expert AI (Stage 1).
@@ -160,7 +168,7 @@ Your job is to analyze this claim for FRAUD PATTERNS, BILLING ANOMALIES, and COS
 - Claim ID: {data.get('claim_id', 'Unknown')}
 - Patient Age: {data.get('patient_age', 'Unknown')} years
 - Provider ID: {data.get('provider_id', 'Unknown')}
-- Provider Specialty: {data.get('provider_specialty') or data.get('specialty', 'Unknown')}
+- Provider Specialty: {specialty}
 - Diagnosis Codes (ICD-10): {diag_str}
 - Procedure Codes (CPT): {proc_str}
 - Claim Amount: ${data.get('claim_amount', 0):,.2f}
@@ -1,24 +1,12 @@
 """Supply chain fraud detection prompts."""
 from typing import Dict, Any, Optional
 
-from .base_prompts import build_rag_section
+from .base_prompts import build_rag_section, prompt_fields
 from app.llm.ofac import build_ofac_risk_warning
 
 
-def build_supply_chain_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
-    """Build fraud detection prompt for supply chain sector."""
-    rag_section = build_rag_section(rag_context)
-    ofac_warning = build_ofac_risk_warning(data, ['supplier_location', 'supplier_country', 'origin_country', 'shipping_location', 'billing_address'])
-
-    doc_complete = data.get('documentation_complete', False)
-    reg_compliance = data.get('regulatory_compliance', False)
-    compliance_risk = ""
-    if not doc_complete:
-        compliance_risk += "⚠️ WARNING: Documentation incomplete - Missing documentation is a HIGH-RISK indicator for fraud!\n"
-    if not reg_compliance:
-        compliance_risk += "⚠️ WARNING: Regulatory compliance issues - Non-compliance is a HIGH-RISK indicator!\n"
-
-    return f"""You are a senior supply chain fraud investigator with expertise in procurement fraud, kickback schemes, and ghost suppliers. Analyze this order and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
+# Static prompt text; per-request values are filled with str.format_map().
+_SUPPLY_CHAIN_PROMPT_TEMPLATE = """You are a senior supply chain fraud investigator with expertise in procurement fraud, kickback schemes, and ghost suppliers. Analyze this order and provide a detailed, professional assessment in plain English. Do NOT generate code or technical syntax.
 
 {rag_section}
 
@@ -26,18 +14,18 @@ CRITICAL FRAUD INDICATORS TO EVALUATE:
 {ofac_warning}{compliance_risk}
 
 Order Details:
-- Supplier ID: {data.get('supplier_id', 'N/A')}
-- Supplier Name: {data.get('supplier_name', 'N/A')}
-- Order Amount: ${data.get('order_amount', 'N/A')}
-- Order Frequency: {data.get('order_frequency', 'N/A')} per year
-- Payment Terms: {data.get('payment_terms', 'N/A')}
-- Supplier Age: {data.get('supplier_age_days', 'N/A')} days (NEW suppliers < 90 days are HIGH RISK)
-- Price Variance: {data.get('price_variance', 'N/A')}% from market average
-- Delivery Variance: {data.get('delivery_variance', 'N/A')}%
-- Quality Issues: {data.get('quality_issues', 'N/A')}
-- Documentation Complete: {data.get('documentation_complete', False)} (FALSE = HIGH RISK)
-- Regulatory Compliance: {data.get('regulatory_compliance', False)} (FALSE = HIGH RISK)
-- Order Details: {data.get('order_details', 'N/A')}
+- Supplier ID: {supplier_id}
+- Supplier Name: {supplier_name}
+- Order Amount: ${order_amount}
+- Order Frequency: {order_frequency} per year
+- Payment Terms: {payment_terms}
+- Supplier Age: {supplier_age_days} days (NEW suppliers < 90 days are HIGH RISK)
+- Price Variance: {price_variance}% from market average
+- Delivery Variance: {delivery_variance}%
+- Quality Issues: {quality_issues}
+- Documentation Complete: {documentation_complete} (FALSE = HIGH RISK)
+- Regulatory Compliance: {regulatory_compliance} (FALSE = HIGH RISK)
+- Order Details: {order_details}
 
 SCORING GUIDELINES (STRICT - be conservative and flag suspicious orders):
 - OFAC sanctioned/high-risk countries: Add 40-60 points (CRITICAL if combined with other flags)
@@ -63,3 +51,41 @@ SCORE CALIBRATION (mandatory — ignore these and your response will be discarde
 - If you list risk factors, your FRAUD_SCORE MUST reflect them numerically
 - FRAUD_SCORE: 22 when you listed "new supplier, price variance, quality issues, missing docs" is WRONG
 """
+
+# Fields rendered with a default other than None when absent from the data
+_SUPPLY_CHAIN_FIELD_DEFAULTS = {
+    'supplier_id': 'N/A',
+    'supplier_name': 'N/A',
+    'order_amount': 'N/A',
+    'order_frequency': 'N/A',
+    'payment_terms': 'N/A',
+    'supplier_age_days': 'N/A',
+    'price_variance': 'N/A',
+    'delivery_variance': 'N/A',
+    'quality_issues': 'N/A',
+    'documentation_complete': False,
+    'regulatory_compliance': False,
+    'order_details': 'N/A',
+}
+
+
+def build_supply_chain_prompt(data: Dict[str, Any], rag_context: Optional[str] = None) -> str:
+    """Build fraud detection prompt for supply chain sector."""
+    rag_section = build_rag_section(rag_context)
+    ofac_warning = build_ofac_risk_warning(data, ['supplier_location', 'supplier_country', 'origin_country', 'shipping_location', 'billing_address'])
+
+    doc_complete = data.get('documentation_complete', False)
+    reg_compliance = data.get('regulatory_compliance', False)
+    compliance_risk = ""
+    if not doc_complete:
+        compliance_risk += "⚠️ WARNING: Documentation incomplete - Missing documentation is a HIGH-RISK indicator for fraud!\n"
+    if not reg_compliance:
+        compliance_risk += "⚠️ WARNING: Regulatory compliance issues - Non-compliance is a HIGH-RISK indicator!\n"
+
+    return _SUPPLY_CHAIN_PROMPT_TEMPLATE.format_map(prompt_fields(
+        _SUPPLY_CHAIN_FIELD_DEFAULTS,
+        data,
+        rag_section=rag_section,
+        ofac_warning=ofac_warning,
+        compliance_risk=compliance_risk,
+    ))
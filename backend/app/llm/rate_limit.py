@@ -0,0 +1,114 @@
+"""
+Client-side provider protection for LLM calls.
+
+One TokenBucket per provider is shared by every request thread in the process,
+so concurrent analyses stop stampeding a shared API token into 429 storms.
+Rates adapt AIMD-style: halve on a 429, creep back up after a run of successes.
+
+One CircuitBreaker per (provider, model) skips a model that keeps failing for a
+cooldown window, instead of paying its full timeout on every request.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate adapts to observed 429s."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float = 0.1,
+        increase_every: int = 10,
+        increase_step: float = 0.5,
+    ):
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.increase_every = max(1, int(increase_every))
+        self.increase_step = float(increase_step)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._successes = 0
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = 10.0) -> bool:
+        """Take one token, waiting up to timeout seconds; False if none became available."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(min(remaining, (1.0 - self._tokens) / self.rate))
+
+    def record_rate_limited(self) -> None:
+        """Multiplicative decrease after a 429."""
+        with self._cond:
+            self._refill()
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._successes = 0
+
+    def record_success(self) -> None:
+        """Additive increase after every increase_every successful calls."""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.increase_every and self.rate < self.max_rate:
+                self._refill()
+                self.rate = min(self.max_rate, self.rate + self.increase_step)
+                self._successes = 0
+                self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """closed → open after N consecutive failures → half_open trial after cooldown."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown_seconds: float = 60.0):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a call may proceed; after cooldown, admits one half-open trial."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> bool:
+        """Count a failure; returns True when this failure (re)opens the breaker."""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                return True
+            return False
@@ -0,0 +1,94 @@
+"""
+Opt-in semantic (L2) cache for single-stage LLM fraud results.
+
+Sits behind the exact-input cache in LLMClient.analyze_fraud: prompts whose
+MiniLM embeddings are near-identical (cosine >= SEMANTIC_CACHE_THRESHOLD) to a
+previously scored prompt in the same sector reuse that result instead of
+calling a provider.
+
+Disabled by default (SEMANTIC_CACHE_ENABLED=1 to enable) — a high threshold is
+required because small field changes (amount, country) can flip a verdict.
+Only real HF embeddings are used; hash-fallback vectors are not semantic.
+"""
+import copy
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .embeddings import EmbeddingGenerator
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "0").lower() in ("1", "true", "yes")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+
+# Native all-MiniLM-L6-v2 width (no Pinecone zero-padding needed here)
+_EMBEDDING_DIMENSIONS = 384
+
+
+class SemanticResponseCache:
+    """Per-sector matrix of normalised prompt embeddings with parallel result lists."""
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_SIZE,
+        embedder: Optional[EmbeddingGenerator] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embedder = embedder
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        if self._embedder is None:
+            self._embedder = EmbeddingGenerator(dimensions=_EMBEDDING_DIMENSIONS)
+        embedding, source = self._embedder.generate_with_source(" ".join(text.split()))
+        if source != "hf":
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def lookup(self, sector: str, prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the closest cached result above threshold, else None."""
+        with self._lock:
+            if not self._results.get(sector):
+                return None
+        vector = self._embed(prompt)
+        if vector is None:
+            return None
+        with self._lock:
+            matrix = self._vectors.get(sector)
+            if matrix is None or not len(matrix):
+                return None
+            scores = matrix @ vector
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            logger.info(f"⚡ [Semantic Cache] {sector} prompt matched cached result (cosine={scores[best]:.3f})")
+            return copy.deepcopy(self._results[sector][best])
+
+    def store(self, sector: str, prompt: str, result: Dict[str, Any]) -> None:
+        """Add a scored result; oldest entries are dropped past max_entries."""
+        if self.max_entries <= 0:
+            return
+        vector = self._embed(prompt)
+        if vector is None:
+            return
+        with self._lock:
+            matrix = self._vectors.get(sector)
+            matrix = vector[None, :] if matrix is None else np.vstack([matrix, vector])
+            results = self._results.setdefault(sector, [])
+            results.append(copy.deepcopy(result))
+            if len(results) > self.max_entries:
+                drop = len(results) - self.max_entries
+                matrix = matrix[drop:]
+                del results[:drop]
+            self._vectors[sector] = matrix
@@ -20,6 +20,8 @@ async def lifespan(app: FastAPI):
     api_deps.set_app_state(app_state)
     yield
     logger.info("Shutting down FraudForge AI...")
+    if app_state.get("hf_client"):
+        app_state["hf_client"].close()
     app_state.clear()
 
 
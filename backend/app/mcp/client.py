@@ -9,12 +9,45 @@ in a standardized way. This enables:
 - Integration with external APIs and databases
 """
 
+import copy
+import json
 import logging
-from typing import Dict, Any, Optional
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# One keep-alive pool per client: enrich_mcp calls the same host on every analysis
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60.0)
+# Worker threads for concurrent tool lookups, shared by every get_context call
+# (threads start on demand; sized to the keep-alive pool)
+_LOOKUP_WORKERS = 16
+
+# Successful tool results keyed by (tool, arguments) (0 disables). The same
+# wallets, providers and sellers recur across transactions.
+MCP_TOOL_CACHE_SIZE = int(os.getenv("MCP_TOOL_CACHE_SIZE", "8192"))
+MCP_TOOL_CACHE_TTL_SECONDS = float(os.getenv("MCP_TOOL_CACHE_TTL_SECONDS", "300"))
+
+# Input fields that trigger at least one tool call, per sector
+_MCP_KEYS = {
+    "banking": ("sender_wallet", "receiver_wallet", "transaction_id"),
+    "medical": ("provider_id",),
+    "ecommerce": ("seller_id",),
+}
+
+# Credentials and reputation move slowly; transaction history does not.
+_TOOL_CACHE_TTL_SECONDS = {
+    "check_provider_credentials": MCP_TOOL_CACHE_TTL_SECONDS * 4,
+    "check_seller_reputation": MCP_TOOL_CACHE_TTL_SECONDS * 4,
+    "get_transaction_history": MCP_TOOL_CACHE_TTL_SECONDS / 5,
+}
+
 
 class MCPClient:
     """
@@ -34,28 +67,43 @@ class MCPClient:
             mcp_server_url: Optional MCP server URL. If not provided,
                           uses environment variable MCP_SERVER_URL
         """
-        import os
         self.mcp_server_url = mcp_server_url or os.getenv("MCP_SERVER_URL")
         if not self.mcp_server_url:
             logger.warning("No MCP server URL configured - MCP features disabled")
             self.enabled = False
+            self._client = None
+            self._pool = None
         else:
             self.enabled = True
+            self._client = httpx.Client(
+                base_url=self.mcp_server_url, timeout=30.0, limits=_HTTP_LIMITS
+            )
+            weakref.finalize(self, self._client.close)
+            self._pool = ThreadPoolExecutor(max_workers=_LOOKUP_WORKERS, thread_name_prefix="mcp")
+            weakref.finalize(self, self._pool.shutdown, wait=False)
             logger.info(f"✅ MCP Client initialized: {self.mcp_server_url}")
+        # (tool, arguments json) -> (stored_at monotonic, result); get_context calls from threads
+        self._tool_cache: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._tool_cache_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Close pooled connections to the MCP server and the lookup threads."""
+        if self._client is not None:
+            self._client.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
 
     def health_check(self) -> Dict[str, Any]:
         """Lightweight MCP server reachability probe (soft-fail friendly)."""
         if not self.enabled:
             return {"ok": False, "detail": "MCP not enabled"}
         try:
-            response = httpx.get(f"{self.mcp_server_url}/health", timeout=3.0)
+            response = self._client.get("/health", timeout=3.0)
             if response.status_code == 200:
                 return {"ok": True, "detail": "healthy"}
             # Prefer POST /tools/list, then GET (demo server supports both)
             for method in ("POST", "GET"):
-                response = httpx.request(
-                    method, f"{self.mcp_server_url}/tools/list", timeout=3.0
-                )
+                response = self._client.request(method, "/tools/list", timeout=3.0)
                 if response.status_code == 200:
                     return {"ok": True, "detail": "tools reachable"}
             return {"ok": False, "detail": f"HTTP {response.status_code}"}
@@ -76,20 +124,55 @@ class MCPClient:
         if not self.enabled:
             return {"error": "MCP not enabled"}
 
+        key = self._tool_cache_key(tool_name, arguments)
+        cached = self._get_cached_tool_result(key)
+        if cached is not None:
+            return cached
+
         try:
-            response = httpx.post(
-                f"{self.mcp_server_url}/tools/call",
+            response = self._client.post(
+                "/tools/call",
                 json={
                     "name": tool_name,
                     "arguments": arguments
                 },
-                timeout=30.0
             )
             response.raise_for_status()
-            return response.json()
+            result = response.json()
         except Exception as e:
             logger.error(f"MCP tool call failed: {e}")
             return {"error": str(e)}
+        self._store_cached_tool_result(key, result)
+        return result
+
+    @staticmethod
+    def _tool_cache_key(tool_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+        return (tool_name, json.dumps(arguments, sort_keys=True, default=str))
+
+    def _get_cached_tool_result(self, key: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of a fresh cached tool result (LRU touch) or None."""
+        ttl = _TOOL_CACHE_TTL_SECONDS.get(key[0], MCP_TOOL_CACHE_TTL_SECONDS)
+        with self._tool_cache_lock:
+            entry = self._tool_cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > ttl:
+                del self._tool_cache[key]
+                return None
+            self._tool_cache.move_to_end(key)
+            cached = entry[1]
+        return copy.deepcopy(cached)
+
+    def _store_cached_tool_result(self, key: Tuple[str, str], result: Any) -> None:
+        """Cache a successful tool result, evicting the least recently used entry."""
+        if MCP_TOOL_CACHE_SIZE <= 0 or not isinstance(result, dict) or "error" in result:
+            return
+        entry = (time.monotonic(), copy.deepcopy(result))
+        with self._tool_cache_lock:
+            self._tool_cache[key] = entry
+            self._tool_cache.move_to_end(key)
+            while len(self._tool_cache) > MCP_TOOL_CACHE_SIZE:
+                self._tool_cache.popitem(last=False)
 
     def get_context(self, sector: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -104,62 +187,78 @@ class MCPClient:
         """
         if not self.enabled:
             return {}
+        # Most inputs carry none of the MCP hooks; skip building the call plan
+        if not any(key in data for key in _MCP_KEYS.get(sector, ())):
+            return {}
 
-        context = {}
+        context: Dict[str, Any] = {}
+        # (context key, sub key or None, tool name, arguments), resolved together below
+        lookups: List[Tuple[str, Optional[str], str, Dict[str, Any]]] = []
 
         # Sector-specific MCP tool calls
         if sector == "banking":
             # Check blockchain addresses if crypto transaction
             if "sender_wallet" in data or "receiver_wallet" in data:
-                context["blockchain_data"] = self._check_blockchain(
-                    data.get("sender_wallet"),
-                    data.get("receiver_wallet")
-                )
+                context["blockchain_data"] = {}
+                for role in ("sender", "receiver"):
+                    address = data.get(f"{role}_wallet")
+                    if address:
+                        lookups.append(("blockchain_data", role, "check_wallet_address", {"address": address}))
 
             # Check transaction history
             if "transaction_id" in data:
-                context["transaction_history"] = self._get_transaction_history(
-                    data["transaction_id"]
-                )
+                lookups.append((
+                    "transaction_history", None, "get_transaction_history",
+                    {"transaction_id": data["transaction_id"]},
+                ))
 
         elif sector == "medical":
             # Check provider credentials
             if "provider_id" in data:
-                context["provider_data"] = self._check_provider(
-                    data["provider_id"]
-                )
+                lookups.append((
+                    "provider_data", None, "check_provider_credentials",
+                    {"provider_id": data["provider_id"]},
+                ))
 
         elif sector == "ecommerce":
             # Check seller reputation
             if "seller_id" in data:
-                context["seller_data"] = self._check_seller(
-                    data.get("seller_id")
-                )
+                context["seller_data"] = {}
+                if data["seller_id"]:
+                    lookups.append((
+                        "seller_data", None, "check_seller_reputation",
+                        {"seller_id": data["seller_id"]},
+                    ))
 
+        results = self._run_lookups([(tool, arguments) for _, _, tool, arguments in lookups])
+        for (key, sub_key, _, _), result in zip(lookups, results):
+            if sub_key is None:
+                context[key] = result
+            else:
+                context[key][sub_key] = result
         return context
 
-    def _check_blockchain(self, sender: Optional[str], receiver: Optional[str]) -> Dict[str, Any]:
-        """Check blockchain addresses using MCP tools."""
-        result = {}
-        if sender:
-            result["sender"] = self.call_tool("check_wallet_address", {"address": sender})
-        if receiver:
-            result["receiver"] = self.call_tool("check_wallet_address", {"address": receiver})
-        return result
-
-    def _get_transaction_history(self, tx_id: str) -> Dict[str, Any]:
-        """Get transaction history using MCP tools."""
-        return self.call_tool("get_transaction_history", {"transaction_id": tx_id})
-
-    def _check_provider(self, provider_id: str) -> Dict[str, Any]:
-        """Check healthcare provider credentials using MCP tools."""
-        return self.call_tool("check_provider_credentials", {"provider_id": provider_id})
-
-    def _check_seller(self, seller_id: Optional[str]) -> Dict[str, Any]:
-        """Check e-commerce seller reputation using MCP tools."""
-        if not seller_id:
-            return {}
-        return self.call_tool("check_seller_reputation", {"seller_id": seller_id})
+    def _run_lookups(self, lookups: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Resolve (tool, arguments) lookups in order. Cached results are served
+        inline; when two or more miss, the misses run at once on the client's
+        pool so latency is the slowest round trip rather than the sum.
+        call_tool never raises, so every lookup gets a result.
+        """
+        results: List[Optional[Dict[str, Any]]] = []
+        misses = []
+        for i, (tool, arguments) in enumerate(lookups):
+            results.append(self._get_cached_tool_result(self._tool_cache_key(tool, arguments)))
+            if results[i] is None:
+                misses.append(i)
+        if len(misses) < 2:
+            for i in misses:
+                results[i] = self.call_tool(*lookups[i])
+        else:
+            futures = [(i, self._pool.submit(self.call_tool, *lookups[i])) for i in misses]
+            for i, future in futures:
+                results[i] = future.result()
+        return results
 
 
 # Global MCP client instance
@@ -7,12 +7,23 @@ show mcp: ok in the decision trace without paid external APIs.
 """
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, Field
 from typing import Dict, Any, List, Optional
+import json
 import logging
 
+try:
+    import orjson
+except ImportError:  # stdlib json responses still work, just slower
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="FraudForge AI MCP Server")
+app = FastAPI(
+    title="FraudForge AI MCP Server",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+)
 
 # Demo wallets that trigger guardrail-visible flags (see BankingForm samples)
 NULL_ADDRESS_PREFIX = "0x000"
@@ -68,8 +79,12 @@ MCP_TOOLS = [
 ]
 
 
-def _tools_payload() -> Dict[str, List[Dict[str, Any]]]:
-    return {"tools": MCP_TOOLS}
+# The tool schema is static, so /tools/list serves bytes encoded once at import
+_TOOLS_JSON = (
+    orjson.dumps({"tools": MCP_TOOLS})
+    if orjson is not None
+    else json.dumps({"tools": MCP_TOOLS}).encode("utf-8")
+)
 
 
 @app.get("/")
@@ -93,11 +108,19 @@ def health():
 @app.post("/tools/list")
 def list_tools():
     """List available MCP tools (GET and POST — client may use either)."""
-    return _tools_payload()
+    return Response(content=_TOOLS_JSON, media_type="application/json")
+
+
+class ToolCall(BaseModel):
+    """Body of POST /tools/call."""
+
+    # Optional so a missing name keeps returning 400 rather than a 422
+    name: Optional[str] = None
+    arguments: Dict[str, Any] = Field(default_factory=dict)
 
 
 @app.post("/tools/call")
-def call_tool(request: Dict[str, Any]):
+def call_tool(request: ToolCall):
     """
     Call an MCP tool.
 
@@ -107,22 +130,13 @@ def call_tool(request: Dict[str, Any]):
         "arguments": {...}
     }
     """
-    tool_name = request.get("name")
-    arguments = request.get("arguments", {})
-
-    if not tool_name:
+    if not request.name:
         raise HTTPException(status_code=400, detail="Tool name required")
 
-    if tool_name == "check_wallet_address":
-        return _check_wallet_address(arguments.get("address"))
-    if tool_name == "get_transaction_history":
-        return _get_transaction_history(arguments.get("transaction_id"))
-    if tool_name == "check_provider_credentials":
-        return _check_provider_credentials(arguments.get("provider_id"))
-    if tool_name == "check_seller_reputation":
-        return _check_seller_reputation(arguments.get("seller_id"))
-
-    raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
+    handler = _TOOL_HANDLERS.get(request.name)
+    if handler is None:
+        raise HTTPException(status_code=404, detail=f"Tool '{request.name}' not found")
+    return handler(request.arguments)
 
 
 def _check_wallet_address(address: Optional[str]) -> Dict[str, Any]:
@@ -205,6 +219,15 @@ def _check_seller_reputation(seller_id: Optional[str]) -> Dict[str, Any]:
     }
 
 
+# Tool name -> handler taking the raw arguments dict (one hashed lookup per call)
+_TOOL_HANDLERS = {
+    "check_wallet_address": lambda args: _check_wallet_address(args.get("address")),
+    "get_transaction_history": lambda args: _get_transaction_history(args.get("transaction_id")),
+    "check_provider_credentials": lambda args: _check_provider_credentials(args.get("provider_id")),
+    "check_seller_reputation": lambda args: _check_seller_reputation(args.get("seller_id")),
+}
+
+
 if __name__ == "__main__":
     import uvicorn
     import os
@@ -0,0 +1,123 @@
+"""Unit tests for the RAG embedding generator."""
+import hashlib
+
+import pytest
+
+from app.llm.embeddings import DiskEmbeddingCache
+from app.llm.embeddings.generator import EmbeddingGenerator
+
+
+def _reference_hash_fallback(text, dimensions):
+    hash_bytes = hashlib.shake_256(text.encode()).digest(dimensions)
+    return [(byte / 255.0) * 2 - 1 for byte in hash_bytes]
+
+
+class TestHashFallback:
+    @pytest.mark.parametrize("dimensions", [1, 32, 384, 2048])
+    @pytest.mark.parametrize("text", ["", "wire 2500 to new payee", "ünïcødé 🚩"])
+    def test_matches_reference_values(self, text, dimensions):
+        embedding = EmbeddingGenerator(dimensions=dimensions)._hash_fallback(text)
+        assert embedding == _reference_hash_fallback(text, dimensions)
+        assert all(type(value) is float for value in embedding)
+
+    def test_dimensions_are_not_a_repeating_cycle(self):
+        embedding = EmbeddingGenerator(dimensions=2048)._hash_fallback("wire 2500 to new payee")
+        assert embedding[:32] != embedding[32:64]
+        assert len(set(embedding)) > 32
+
+
+class TestEmbeddingCache:
+    def test_repeat_text_is_generated_once(self, monkeypatch):
+        generator = EmbeddingGenerator(dimensions=8)
+        calls = []
+        monkeypatch.setattr(generator, "_try_hf_embedding", lambda text: calls.append(text) or [0.5] * 8)
+        assert generator.generate("wire") == generator.generate("wire")
+        assert calls == ["wire"]
+
+    def test_least_recently_used_text_is_evicted(self, monkeypatch):
+        import app.llm.embeddings.generator as generator_module
+        monkeypatch.setattr(generator_module, "EMBEDDING_CACHE_SIZE", 2)
+        generator = EmbeddingGenerator(dimensions=8)
+        calls = []
+        monkeypatch.setattr(generator, "_try_hf_embedding", lambda text: calls.append(text) or [0.5] * 8)
+        for text in ("a", "b", "a", "c", "a", "b"):
+            generator.generate(text)
+        assert calls == ["a", "b", "c", "b"]
+
+    def test_cache_hit_reports_the_cached_vectors_source(self, monkeypatch):
+        generator = EmbeddingGenerator(dimensions=8)
+        monkeypatch.setattr(generator, "_try_hf_embedding", lambda text: None if text == "down" else [0.5] * 8)
+        generator.generate("down")
+        generator.generate("up")
+        assert generator.generate_with_source("down") == (generator._hash_fallback("down"), "hash")
+        assert generator.last_source == "hash"
+
+
+class TestGenerateBatch:
+    @staticmethod
+    def _fake_hf(monkeypatch, generator, batches):
+        def fake(texts):
+            batches.append(list(texts))
+            return [[float(len(text))] * 8 for text in texts]
+
+        monkeypatch.setattr(generator, "_try_hf_embeddings", fake)
+
+    def test_duplicates_and_cached_texts_are_embedded_once(self, monkeypatch):
+        generator = EmbeddingGenerator(dimensions=8)
+        batches = []
+        self._fake_hf(monkeypatch, generator, batches)
+        generator.generate_batch(["a"])
+        embeddings = generator.generate_batch(["bb", "a", "bb", "ccc"])
+        assert batches == [["a"], ["bb", "ccc"]]
+        assert [e[0] for e in embeddings] == [2.0, 1.0, 2.0, 3.0]
+        assert generator.last_source == "hf"
+
+    def test_misses_are_chunked_per_request(self, monkeypatch):
+        import app.llm.embeddings.generator as generator_module
+        monkeypatch.setattr(generator_module, "HF_EMBEDDING_BATCH_SIZE", 2)
+        generator = EmbeddingGenerator(dimensions=8)
+        batches = []
+        self._fake_hf(monkeypatch, generator, batches)
+        generator.generate_batch(["a", "b", "c"])
+        assert batches == [["a", "b"], ["c"]]
+
+    def test_hf_failure_falls_back_to_hash_vectors(self, monkeypatch):
+        generator = EmbeddingGenerator(dimensions=8)
+        monkeypatch.setattr(generator, "_try_hf_embeddings", lambda texts: None)
+        assert generator.generate_batch(["a"]) == [generator._hash_fallback("a")]
+        assert generator.last_source == "hash"
+
+    def test_sources_are_reported_per_text(self, monkeypatch):
+        generator = EmbeddingGenerator(dimensions=8)
+        monkeypatch.setattr(generator, "_try_hf_embedding", lambda text: None)
+        generator.generate("cached")
+        monkeypatch.setattr(generator, "_try_hf_embeddings", lambda texts: [[1.0] * 8 if t == "a" else None for t in texts])
+        _, sources = generator.generate_batch_with_sources(["a", "cached", "b", "a"])
+        assert sources == ["hf", "hash", "hash", "hf"]
+
+
+class TestDiskEmbeddingCache:
+    def test_vectors_round_trip_exactly(self, tmp_path):
+        cache = DiskEmbeddingCache(str(tmp_path / "e.db"), "model", 3)
+        cache.put_many({"a": [0.1, -0.2, 1 / 3]})
+        assert cache.get_many(["a", "b"]) == {"a": [0.1, -0.2, 1 / 3]}
+
+    def test_model_and_dimensions_are_part_of_the_key(self, tmp_path):
+        path = str(tmp_path / "e.db")
+        DiskEmbeddingCache(path, "model", 3).put_many({"a": [1.0, 2.0, 3.0]})
+        assert DiskEmbeddingCache(path, "other", 3).get_many(["a"]) == {}
+        assert DiskEmbeddingCache(path, "model", 4).get_many(["a"]) == {}
+
+    def test_rerun_skips_hf_and_hash_vectors_are_not_persisted(self, tmp_path):
+        path = str(tmp_path / "e.db")
+        first = EmbeddingGenerator(dimensions=2, disk_cache=DiskEmbeddingCache(path, "m", 2))
+        hf_vectors = {"a": [0.5, 0.5], "b": None}
+        first._try_hf_embeddings = lambda texts: [hf_vectors[t] for t in texts]
+        first.generate_batch(["a", "b"])
+
+        second = EmbeddingGenerator(dimensions=2, disk_cache=DiskEmbeddingCache(path, "m", 2))
+        requested = []
+        second._try_hf_embeddings = lambda texts: requested.extend(texts) or [[0.9, 0.9] for _ in texts]
+        assert second.generate_batch(["a", "b"]) == [[0.5, 0.5], [0.9, 0.9]]
+        assert requested == ["b"]
+        assert second.last_source == "hf"
@@ -26,6 +26,15 @@ class TestExplainBanking:
         result = explain_banking(data, 10)
         assert "legitimate" in result.lower()
 
+    @pytest.mark.parametrize("score,expected", [
+        (85, "further investigation"), (84, "HIGH risk"), (60, "HIGH risk"),
+        (59, "MEDIUM risk"), (30, "MEDIUM risk"), (29, "Mitigating factors"),
+        (float("nan"), "Mitigating factors"),
+    ])
+    def test_score_band_context(self, score, expected):
+        result = explain_banking({"amount": 15000}, score)
+        assert expected in result
+
 
 class TestExplainMedical:
     def test_high_claim_amount(self):
@@ -0,0 +1,153 @@
+"""Unit tests for the MCP HTTP client."""
+import json
+import threading
+
+import httpx
+import pytest
+
+from app.mcp.client import MCPClient
+
+
+def _client_with_transport(handler):
+    client = MCPClient("http://mcp.test")
+    client._client = httpx.Client(base_url=client.mcp_server_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+class TestHttpPool:
+    def test_tool_calls_share_the_pooled_client(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, request.url.path, json.loads(request.content)))
+            return httpx.Response(200, json={"ok": True})
+
+        client = _client_with_transport(handler)
+        assert client.call_tool("check_seller_reputation", {"seller_id": "S-1"}) == {"ok": True}
+        assert client.call_tool("check_seller_reputation", {"seller_id": "S-2"}) == {"ok": True}
+        assert [path for _, path, _ in seen] == ["/tools/call", "/tools/call"]
+        assert seen[1][2] == {"name": "check_seller_reputation", "arguments": {"seller_id": "S-2"}}
+
+    def test_http_errors_are_returned_not_raised(self):
+        client = _client_with_transport(lambda request: httpx.Response(503))
+        assert "error" in client.call_tool("check_wallet_address", {"address": "0xabc"})
+        assert client.health_check()["ok"] is False
+
+    def test_health_check_uses_health_route(self):
+        client = _client_with_transport(lambda request: httpx.Response(200 if request.url.path == "/health" else 404))
+        assert client.health_check() == {"ok": True, "detail": "healthy"}
+
+
+class TestGetContext:
+    def test_disabled_client_returns_empty_context(self, monkeypatch):
+        monkeypatch.delenv("MCP_SERVER_URL", raising=False)
+        assert MCPClient().get_context("banking", {"transaction_id": "TX-1"}) == {}
+
+    def test_inputs_without_mcp_fields_make_no_calls(self, monkeypatch):
+        client = MCPClient("http://mcp.test")
+        monkeypatch.setattr(client, "call_tool", lambda name, arguments: pytest.fail("unexpected tool call"))
+        assert client.get_context("banking", {"amount": 2500}) == {}
+        assert client.get_context("supply_chain", {"supplier_id": "SUP-1"}) == {}
+
+    def test_banking_tool_calls_run_concurrently(self, monkeypatch):
+        client = MCPClient("http://mcp.test")
+        # Wallet and history lookups must both be in flight before either returns
+        barrier = threading.Barrier(2, timeout=5)
+
+        def call_tool(name, arguments):
+            barrier.wait()
+            return {"tool": name}
+
+        monkeypatch.setattr(client, "call_tool", call_tool)
+        context = client.get_context("banking", {"sender_wallet": "0xabc", "transaction_id": "TX-1"})
+        assert context == {
+            "blockchain_data": {"sender": {"tool": "check_wallet_address"}},
+            "transaction_history": {"tool": "get_transaction_history"},
+        }
+
+    def test_sender_and_receiver_wallets_are_checked_concurrently(self, monkeypatch):
+        client = MCPClient("http://mcp.test")
+        barrier = threading.Barrier(2, timeout=5)
+
+        def call_tool(name, arguments):
+            barrier.wait()
+            return {"address": arguments["address"]}
+
+        monkeypatch.setattr(client, "call_tool", call_tool)
+        assert client.get_context("banking", {"sender_wallet": "0xabc", "receiver_wallet": "0xdef"}) == {
+            "blockchain_data": {
+                "sender": {"address": "0xabc"},
+                "receiver": {"address": "0xdef"},
+            },
+        }
+
+    def test_single_or_cached_lookups_skip_the_pool(self, monkeypatch):
+        client = MCPClient("http://mcp.test")
+        monkeypatch.setattr(client._pool, "submit", lambda *args: pytest.fail("unexpected pool use"))
+        monkeypatch.setattr(client, "call_tool", lambda name, arguments: {"tool": name})
+        client._store_cached_tool_result(
+            client._tool_cache_key("check_wallet_address", {"address": "0xabc"}), {"cached": True}
+        )
+        context = client.get_context("banking", {"sender_wallet": "0xabc", "transaction_id": "TX-1"})
+        assert context == {
+            "blockchain_data": {"sender": {"cached": True}},
+            "transaction_history": {"tool": "get_transaction_history"},
+        }
+
+    def test_close_shuts_down_the_lookup_pool(self):
+        client = MCPClient("http://mcp.test")
+        client.close()
+        with pytest.raises(RuntimeError):
+            client._pool.submit(lambda: None)
+
+    def test_sector_keys_match_tool_results(self, monkeypatch):
+        client = MCPClient("http://mcp.test")
+        monkeypatch.setattr(client, "call_tool", lambda name, arguments: {"tool": name})
+        context = client.get_context("banking", {
+            "sender_wallet": "0xabc",
+            "receiver_wallet": "0xdef",
+            "transaction_id": "TX-1",
+        })
+        assert context == {
+            "blockchain_data": {
+                "sender": {"tool": "check_wallet_address"},
+                "receiver": {"tool": "check_wallet_address"},
+            },
+            "transaction_history": {"tool": "get_transaction_history"},
+        }
+        assert client.get_context("ecommerce", {"seller_id": "S-1"}) == {
+            "seller_data": {"tool": "check_seller_reputation"},
+        }
+
+
+class TestToolCache:
+    @staticmethod
+    def _counting_client(payload):
+        calls = []
+
+        def handler(request):
+            calls.append(json.loads(request.content))
+            return httpx.Response(200, json=payload)
+
+        return _client_with_transport(handler), calls
+
+    def test_repeat_entity_is_served_from_cache(self):
+        client, calls = self._counting_client({"seller_id": "S-1", "tags": []})
+        first = client.call_tool("check_seller_reputation", {"seller_id": "S-1"})
+        first["tags"].append("mutated")
+        assert client.call_tool("check_seller_reputation", {"seller_id": "S-1"})["tags"] == []
+        assert len(calls) == 1
+
+    def test_error_payloads_are_not_cached(self):
+        client, calls = self._counting_client({"error": "Seller ID required"})
+        client.call_tool("check_seller_reputation", {"seller_id": ""})
+        client.call_tool("check_seller_reputation", {"seller_id": ""})
+        assert len(calls) == 2
+
+    def test_expired_entries_are_refetched(self, monkeypatch):
+        import app.mcp.client as mcp_client
+        monkeypatch.setitem(mcp_client._TOOL_CACHE_TTL_SECONDS, "get_transaction_history", 0.0)
+        client, calls = self._counting_client({"transaction_id": "TX-1"})
+        client.call_tool("get_transaction_history", {"transaction_id": "TX-1"})
+        client.call_tool("get_transaction_history", {"transaction_id": "TX-1"})
+        assert len(calls) == 2
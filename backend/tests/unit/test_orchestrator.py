@@ -0,0 +1,415 @@
+"""Unit tests for the multi-provider LLM client."""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+
+from app.llm.orchestrator import (
+    LLMClient,
+    _error_status,
+    _hf_chat_support,
+    _is_rate_limited,
+    _retry_delay,
+)
+
+
+BANKING_TX = {
+    "transaction_id": "TX-1001",
+    "transaction_type": "wire",
+    "amount": 2500,
+    "source_country": "United States",
+    "destination_country": "Canada",
+    "account_age_days": 400,
+    "kyc_verified": True,
+    "ip_address": "203.0.113.7",
+}
+
+PARSED = {
+    "fraud_score": 22,
+    "risk_level": "LOW",
+    "risk_factors": ["Established account"],
+    "reasoning": "Routine transfer.",
+    "score_parsed": True,
+}
+
+
+class TestResponseCache:
+    def test_identical_prompt_served_from_cache(self):
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_try_openrouter_model", return_value=dict(PARSED)) as mock_or, \
+                patch.object(client, "_try_hf_model", return_value=dict(PARSED)) as mock_hf:
+            first = client.analyze_fraud("banking", BANKING_TX)
+            second = client.analyze_fraud("banking", BANKING_TX)
+
+        assert mock_or.call_count + mock_hf.call_count == 1
+        assert second == first
+        assert second is not first
+
+    def test_cached_result_is_isolated_from_caller_mutation(self):
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_try_openrouter_model", return_value=dict(PARSED)), \
+                patch.object(client, "_try_hf_model", return_value=dict(PARSED)):
+            first = client.analyze_fraud("banking", BANKING_TX)
+            first["risk_factors"].append("mutated")
+            second = client.analyze_fraud("banking", BANKING_TX)
+
+        assert second["risk_factors"] == ["Established account"]
+
+    def test_unparsed_results_are_not_cached(self):
+        client = LLMClient(api_token="unused")
+        unparsed = {**PARSED, "score_parsed": False}
+        with patch.object(client, "_try_openrouter_model", return_value=dict(unparsed)), \
+                patch.object(client, "_try_hf_model", return_value=dict(unparsed)), \
+                patch.object(client, "_fallback_analysis", return_value={"fraud_score": 10}):
+            client.analyze_fraud("banking", BANKING_TX)
+
+        assert len(client._response_cache) == 0
+
+    def test_expired_entries_are_refreshed(self, monkeypatch):
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_try_openrouter_model", return_value=dict(PARSED)) as mock_or, \
+                patch.object(client, "_try_hf_model", return_value=dict(PARSED)) as mock_hf:
+            client.analyze_fraud("banking", BANKING_TX)
+            monkeypatch.setattr("app.llm.orchestrator.LLM_RESPONSE_CACHE_TTL_SECONDS", -1)
+            client.analyze_fraud("banking", BANKING_TX)
+
+        assert mock_or.call_count + mock_hf.call_count == 2
+
+    def test_rag_whitespace_does_not_change_key(self):
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_try_openrouter_model", return_value=dict(PARSED)), \
+                patch.object(client, "_try_hf_model", return_value=dict(PARSED)):
+            client.analyze_fraud("banking", BANKING_TX, rag_context="Pattern A:  wire to\nnew payee")
+            client.analyze_fraud("banking", BANKING_TX, rag_context="Pattern A: wire to new payee")
+
+        assert (client.cache_hits, client.cache_misses) == (1, 1)
+
+    def test_two_stage_results_are_cached(self):
+        client = LLMClient(api_token="unused")
+        two_stage = {**PARSED, "provider": "two_stage", "stage2_model": "nvidia/nemotron"}
+        with patch.object(client, "_analyze_two_stage", return_value=dict(two_stage)) as mock_two_stage:
+            client.analyze_fraud("medical", {"claim_id": "CLM-1"})
+            client.analyze_fraud("medical", {"claim_id": "CLM-1"})
+
+        assert mock_two_stage.call_count == 1
+
+    def test_rule_based_fallback_is_memoised(self):
+        client = LLMClient(api_token="unused")
+        rules = {"fraud_score": 40, "risk_level": "MEDIUM", "reasoning": "r", "risk_factors": ["Rule-based analysis"]}
+        with patch("app.core.analyze_fraud_rule_based", return_value=rules) as mock_rules:
+            first = client._fallback_analysis("banking", BANKING_TX)
+            first["risk_factors"].append("mutated")
+            second = client._fallback_analysis("banking", dict(BANKING_TX))
+
+        assert mock_rules.call_count == 1
+        assert second["risk_factors"] == ["Rule-based analysis"]
+
+    def test_rule_blended_two_stage_results_are_not_cached(self):
+        client = LLMClient(api_token="unused")
+        blended = {**PARSED, "provider": "two_stage", "stage2_model": "rule_based"}
+        with patch.object(client, "_analyze_two_stage", return_value=dict(blended)) as mock_two_stage:
+            client.analyze_fraud("medical", {"claim_id": "CLM-1"})
+            client.analyze_fraud("medical", {"claim_id": "CLM-1"})
+
+        assert mock_two_stage.call_count == 2
+
+
+def _openrouter_response(content, finish_reason="stop"):
+    return httpx.Response(
+        200,
+        json={
+            "choices": [{"message": {"content": content}, "finish_reason": finish_reason}],
+            "usage": {},
+        },
+        request=httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions"),
+    )
+
+
+class TestOpenRouterStageDispatch:
+    CLINICAL = (
+        '{"clinical_legitimacy_score": 35, "reasoning": "Procedure is unusual for this diagnosis.", '
+        '"risk_factors": ["Diagnosis/procedure mismatch"]}'
+    )
+
+    def test_clinical_stage_uses_clinical_parser(self, monkeypatch):
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        client = LLMClient(api_token="unused")
+        with patch.object(client._http, "post", return_value=_openrouter_response(self.CLINICAL)):
+            result = client._try_openrouter_model(
+                "some/model", "prompt", "medical", {}, is_clinical_stage=True
+            )
+
+        assert result["clinical_legitimacy_score"] == 35
+        assert result["risk_factors"] == ["Diagnosis/procedure mismatch"]
+
+    def test_fraud_stage_uses_fraud_parser(self, monkeypatch):
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        client = LLMClient(api_token="unused")
+        text = "FRAUD_SCORE: 72\nRISK_LEVEL: HIGH\nREASONING: Billing pattern matches known upcoding schemes."
+        with patch.object(client._http, "post", return_value=_openrouter_response(text)):
+            result = client._try_openrouter_model("some/model", "prompt", "medical", {})
+
+        assert result["fraud_score"] == 72
+        assert "clinical_legitimacy_score" not in result
+
+
+def _sse(*contents):
+    lines = [
+        'data: {"choices": [{"delta": {"content": %s}}]}\n\n' % json.dumps(piece)
+        for piece in contents
+    ]
+    return [line.encode() for line in lines] + [b"data: [DONE]\n\n"]
+
+
+class TestStreamedResponses:
+    def _streaming_client(self, monkeypatch, chunks, consumed):
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+        monkeypatch.setattr("app.llm.orchestrator.LLM_STREAM_RESPONSES", True)
+
+        def body():
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        def handler(request):
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(200, content=body())
+
+        client = LLMClient(api_token="unused")
+        client._http = httpx.Client(transport=httpx.MockTransport(handler))
+        return client
+
+    def test_stops_reading_once_reasoning_paragraph_is_done(self, monkeypatch):
+        chunks = _sse(
+            "FRAUD_SCORE: 81\nRISK_LEVEL: HIGH\n",
+            "REASONING: VPN login and a brand-new payee.",
+            "\n\n",
+            "Additional notes the model keeps generating...",
+        )
+        consumed = []
+        client = self._streaming_client(monkeypatch, chunks, consumed)
+        result = client._try_openrouter_model("some/model", "prompt", "banking", {})
+
+        assert result["fraud_score"] == 81
+        assert "Additional notes" not in result["reasoning"]
+        assert len(consumed) < len(chunks)
+
+    def test_clinical_stage_reads_whole_stream(self, monkeypatch):
+        chunks = _sse('{"clinical_legitimacy_score": 35, ', '"reasoning": "Unusual procedure."}')
+        consumed = []
+        client = self._streaming_client(monkeypatch, chunks, consumed)
+        result = client._try_openrouter_model(
+            "some/model", "prompt", "medical", {}, is_clinical_stage=True
+        )
+
+        assert result["clinical_legitimacy_score"] == 35
+        assert len(consumed) == len(chunks)
+
+
+class TestHttpPool:
+    def test_inference_client_is_created_lazily(self):
+        with patch("app.llm.orchestrator.InferenceClient") as mock_cls:
+            client = LLMClient(api_token="unused")
+            assert mock_cls.call_count == 0
+            assert client.client is client.client
+        assert mock_cls.call_count == 1
+
+    def test_close_is_idempotent(self):
+        client = LLMClient(api_token="unused")
+        client.close()
+        client.close()
+        assert client._http.is_closed
+
+
+class TestHedgedRequests:
+    @staticmethod
+    def _fake_call(delays):
+        """Candidate stub: sleeps per model, then returns a parsed result tagged with the model."""
+        def call(cfg, prompt, sector, data):
+            time.sleep(delays.get(cfg["model"], 0))
+            return {**PARSED, "reasoning": cfg["model"]}
+        return call
+
+    def test_slow_primary_is_hedged_by_first_fallback(self, monkeypatch):
+        monkeypatch.setattr("app.llm.orchestrator.LLM_HEDGE_DELAY_SECONDS", 0.05)
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_call_candidate", side_effect=self._fake_call({"Qwen/Qwen3-32B": 0.5})):
+            result = client.analyze_fraud("banking", BANKING_TX)
+
+        assert result["reasoning"] == "nvidia/nemotron-3-super-120b-a12b:free"
+        client.close()
+
+    def test_fast_primary_skips_hedge(self, monkeypatch):
+        monkeypatch.setattr("app.llm.orchestrator.LLM_HEDGE_DELAY_SECONDS", 0.5)
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_call_candidate", side_effect=self._fake_call({})) as mock_call:
+            result = client.analyze_fraud("banking", BANKING_TX)
+
+        assert result["reasoning"] == "Qwen/Qwen3-32B"
+        assert mock_call.call_count == 1
+        client.close()
+
+    def test_hedging_disabled_by_default(self):
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_call_candidate", side_effect=[None, None, dict(PARSED)]) as mock_call:
+            result = client.analyze_fraud("banking", BANKING_TX)
+
+        assert mock_call.call_count == 3
+        assert result["fraud_score"] == PARSED["fraud_score"]
+        assert client._hedge_pool is None
+
+    def test_concurrent_callers_share_one_hedge_pool(self):
+        client = LLMClient(api_token="unused")
+        barrier = threading.Barrier(8)
+
+        def get_pool():
+            barrier.wait()
+            return client._get_hedge_pool()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            pools = list(pool.map(lambda _: get_pool(), range(8)))
+
+        assert all(p is pools[0] for p in pools)
+        client.close()
+
+
+class TestAnalyzeFraudBatch:
+    def test_results_keep_input_order_and_run_concurrently(self):
+        client = LLMClient(api_token="unused")
+        records = [{**BANKING_TX, "transaction_id": f"TX-{i}"} for i in range(4)]
+
+        def call(cfg, prompt, sector, data):
+            time.sleep(0.2 if data["transaction_id"] == "TX-0" else 0.05)
+            return {**PARSED, "reasoning": data["transaction_id"]}
+
+        started = time.monotonic()
+        with patch.object(client, "_call_candidate", side_effect=call):
+            results = client.analyze_fraud_batch("banking", records)
+
+        assert [r["reasoning"] for r in results] == ["TX-0", "TX-1", "TX-2", "TX-3"]
+        assert time.monotonic() - started < 0.35
+
+    def test_serial_when_concurrency_is_one(self, monkeypatch):
+        monkeypatch.setattr("app.llm.orchestrator.LLM_BATCH_CONCURRENCY", 1)
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "analyze_fraud", return_value=dict(PARSED)) as mock_analyze:
+            results = client.analyze_fraud_batch("banking", [BANKING_TX, BANKING_TX], ["ctx", None])
+
+        assert len(results) == 2
+        assert mock_analyze.call_args_list[0].kwargs == {"rag_context": "ctx"}
+
+    @pytest.mark.parametrize("sector, contexts", [("crypto", None), ("banking", ["only one", "extra"])])
+    def test_rejects_bad_arguments(self, sector, contexts):
+        client = LLMClient(api_token="unused")
+        with pytest.raises(ValueError):
+            client.analyze_fraud_batch(sector, [BANKING_TX], contexts)
+
+
+def _status_error(status, headers=None):
+    request = httpx.Request("POST", "https://example.invalid")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestRateLimitHandling:
+    def test_status_and_retry_after_read_from_typed_error(self):
+        assert _error_status(_status_error(429, {"Retry-After": "7"})) == (429, 7.0)
+
+    def test_http_date_retry_after_is_ignored(self):
+        assert _error_status(_status_error(429, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"})) == (429, None)
+
+    @pytest.mark.parametrize("exc,status,expected", [
+        (_status_error(429), 429, True),
+        (_status_error(500), 500, False),
+        (RuntimeError("429 Too Many Requests"), None, True),
+        (RuntimeError("connection reset"), None, False),
+    ])
+    def test_is_rate_limited(self, exc, status, expected):
+        assert _is_rate_limited(exc, status) is expected
+
+    @pytest.mark.parametrize("backoff,retry_after,low,high", [
+        (2.0, None, 2.0, 3.0),
+        (2.0, 7.0, 7.0, 10.5),
+        (2.0, 600.0, 30.0, 45.0),
+        (64.0, None, 30.0, 45.0),
+    ])
+    def test_retry_delay_bounds(self, backoff, retry_after, low, high):
+        for _ in range(50):
+            assert low <= _retry_delay(backoff, retry_after) <= high
+
+    def test_hf_chat_honors_retry_after(self):
+        client = LLMClient(api_token="unused")
+        message = MagicMock()
+        message.content = "FRAUD_SCORE: 33\nRISK_LEVEL: MEDIUM\nREASONING: Account history is mostly consistent."
+        response = MagicMock()
+        response.choices = [MagicMock(message=message)]
+        hf = MagicMock()
+        hf.chat_completion.side_effect = [_status_error(429, {"Retry-After": "5"}), response]
+        with patch.object(client, "_get_hf_client", return_value=hf), \
+                patch("app.llm.orchestrator.time.sleep") as mock_sleep:
+            result = client._try_hf_model("Qwen/Qwen3-32B", "prompt", "banking", {})
+
+        assert result["fraud_score"] == 33
+        assert mock_sleep.call_count == 1
+        assert mock_sleep.call_args[0][0] >= 5.0
+        assert client._rate_limiters["hf"].rate == pytest.approx(2.5)
+
+    def test_saturated_bucket_skips_provider_call(self):
+        client = LLMClient(api_token="unused")
+        hf = MagicMock()
+        with patch.object(client, "_get_hf_client", return_value=hf), \
+                patch.object(client._rate_limiters["hf"], "acquire", return_value=False):
+            result = client._try_hf_model("Qwen/Qwen3-32B", "prompt", "banking", {})
+
+        assert result is None
+        hf.chat_completion.assert_not_called()
+
+
+class TestTextGenerationResult:
+    TEXT = "FRAUD_SCORE: 61\nRISK_LEVEL: HIGH\nREASONING: New account wiring funds to a high-risk corridor."
+
+    @pytest.mark.parametrize("result", [TEXT, MagicMock(generated_text=TEXT)])
+    def test_str_and_output_objects(self, result):
+        client = LLMClient(api_token="unused")
+        hf = MagicMock()
+        hf.text_generation.return_value = result
+        with patch.object(client, "_get_hf_client", return_value=hf):
+            parsed = client._try_hf_model("mistralai/Mistral-7B-Instruct-v0.2", "prompt", "banking", {})
+
+        assert parsed["fraud_score"] == 61
+        assert hf.text_generation.call_args.kwargs["stream"] is False
+
+
+class TestCircuitBreaker:
+    def test_failing_model_is_skipped_while_open(self, monkeypatch):
+        monkeypatch.setattr("app.llm.orchestrator.LLM_BREAKER_FAILURES", 2)
+        client = LLMClient(api_token="unused")
+        with patch.object(client, "_try_openrouter_model", return_value=None) as mock_or:
+            for _ in range(4):
+                client._guarded_call("openrouter", "m", client._try_openrouter_model, "m", "p", "banking", {})
+
+        assert mock_or.call_count == 2
+
+    def test_exceptions_count_as_failures_and_propagate(self, monkeypatch):
+        monkeypatch.setattr("app.llm.orchestrator.LLM_BREAKER_FAILURES", 1)
+        client = LLMClient(api_token="unused")
+        boom = MagicMock(side_effect=ValueError("chat-only model failed"))
+        with pytest.raises(ValueError):
+            client._guarded_call("hf", "m", boom)
+        assert client._guarded_call("hf", "m", boom) is None
+        assert boom.call_count == 1
+
+
+class TestHfChatSupport:
+    @pytest.mark.parametrize("model_name, expected", [
+        ("mistralai/Mistral-7B-Instruct-v0.2", (True, False)),
+        ("Qwen/Qwen3-32B", (False, True)),
+        ("google/medgemma-27b-text-it", (False, True)),
+        ("nvidia/some-other-model", (False, False)),
+    ])
+    def test_substring_rules(self, model_name, expected):
+        assert _hf_chat_support(model_name) == expected
@@ -0,0 +1,234 @@
+"""Unit tests for LLM response parsing."""
+import pytest
+from app.llm.parsing import (
+    MAX_PARSE_CHARS,
+    fraud_response_complete,
+    parse_model_response,
+    parse_model_responses,
+    clean_reasoning,
+    _clean_reasoning_fast,
+    _clean_reasoning_slow,
+)
+
+
+class TestParseFraudResponse:
+    def test_json_block(self):
+        text = (
+            '```json\n{"fraud_score": 82, "risk_level": "HIGH", '
+            '"risk_factors": ["VPN detected", "New account"], '
+            '"reasoning": "Multiple red flags were detected in this transaction including a VPN '
+            'connection and an account that was created only two days before the transfer."}\n```'
+        )
+        result = parse_model_response(text, "banking", {})
+        assert result["fraud_score"] == 82
+        assert result["risk_level"] == "HIGH"
+        assert result["risk_factors"] == ["VPN detected", "New account"]
+        assert result["score_parsed"] is True
+
+    def test_structured_template(self):
+        text = (
+            "FRAUD_SCORE: 91\n"
+            "RISK_LEVEL: CRITICAL\n"
+            "RISK_FACTORS: OFAC destination country, VPN/proxy IP, unverified KYC\n"
+            "REASONING: The transfer targets a sanctioned jurisdiction via a proxied IP address "
+            "and the account has not completed KYC, which together indicate critical risk."
+        )
+        result = parse_model_response(text, "banking", {})
+        assert result["fraud_score"] == 91
+        assert result["risk_level"] == "CRITICAL"
+        assert "VPN/proxy IP" in result["risk_factors"]
+        assert result["reasoning"].startswith("The transfer targets")
+        assert result["score_parsed"] is True
+
+    def test_truncated_score_rejected(self):
+        result = parse_model_response("FRAUD_SCORE: 9", "banking", {})
+        assert result["score_parsed"] is False
+        assert result["fraud_score"] == 50
+
+    def test_score_context_fallback(self):
+        text = "After reviewing everything, the overall risk score: 64 given the price variance of 22%."
+        result = parse_model_response(text, "supply_chain", {})
+        assert result["fraud_score"] == 64
+        assert result["risk_level"] == "HIGH"
+
+    def test_unparseable_text(self):
+        result = parse_model_response("I cannot help with that request.", "banking", {})
+        assert result["score_parsed"] is False
+        assert result["fraud_score"] == 50
+        assert result["risk_level"] == "MEDIUM"
+
+    def test_template_score_above_range_is_clamped(self):
+        text = (
+            "FRAUD_SCORE: 250\nRISK_LEVEL: CRITICAL\n"
+            "REASONING: Every available signal on this order points to organised fraud activity."
+        )
+        result = parse_model_response(text, "ecommerce", {})
+        assert result["fraud_score"] == 100
+
+    def test_non_numeric_json_score_falls_through(self):
+        text = '{"fraud_score": "high"}\nFRAUD_SCORE: 70\nRISK_LEVEL: HIGH\nREASONING: Seller is new.'
+        result = parse_model_response(text, "ecommerce", {})
+        assert result["fraud_score"] == 70
+
+    def test_long_reasoning_truncated_at_sentence_end(self):
+        sentence = "The seller account is new and pricing is far below the market rate. "
+        text = "FRAUD_SCORE: 77\nRISK_LEVEL: HIGH\nREASONING: " + sentence * 30
+        result = parse_model_response(text, "ecommerce", {})
+        assert len(result["reasoning"]) <= 1200
+        assert result["reasoning"].endswith(".")
+
+    @pytest.mark.parametrize("text", ["", "   \n"])
+    def test_empty_text(self, text):
+        result = parse_model_response(text, "banking", {})
+        assert result["score_parsed"] is False
+        assert result["fraud_score"] == 50
+        assert result["risk_factors"] == []
+
+    def test_empty_text_results_are_independent(self):
+        first = parse_model_response("", "banking", {})
+        first["risk_factors"].append("mutated")
+        first["fraud_score"] = 99
+        second = parse_model_response("", "banking", {})
+        assert second["risk_factors"] == []
+        assert second["fraud_score"] == 50
+
+    def test_text_without_digits_keeps_reasoning(self):
+        text = (
+            "RISK_LEVEL: HIGH\nREASONING: The buyer used a proxied connection and an unverified email "
+            "address while shipping to a freight forwarder, which is a common reshipping scam pattern."
+        )
+        result = parse_model_response(text, "ecommerce", {})
+        assert result["score_parsed"] is False
+        assert result["reasoning"].startswith("The buyer used a proxied connection")
+
+    def test_reasoning_casing_preserved_when_lowercase_expands(self):
+        # 'İ'.lower() is two code points; spans must still line up with the original text.
+        text = (
+            "FRAUD_SCORE: 68\nRISK_LEVEL: HIGH\n"
+            "REASONING: Shipping to İstanbul via a Freight Forwarder with a brand new account."
+        )
+        result = parse_model_response(text, "ecommerce", {})
+        assert result["fraud_score"] == 68
+        assert result["reasoning"].startswith("Shipping to İstanbul via a Freight Forwarder")
+
+    def test_markers_past_parse_cap_are_ignored(self):
+        text = "thinking " * MAX_PARSE_CHARS + "FRAUD_SCORE: 41\nRISK_LEVEL: MEDIUM\nREASONING: Late answer."
+        result = parse_model_response(text, "banking", {})
+        assert result["score_parsed"] is False
+        assert len(result["reasoning"]) <= 1200
+
+    @pytest.mark.parametrize("text,expected", [
+        ("The model gave a score of 350 at first, then revised to score 35.", 35),
+        ("Final score: 18 after review.", 18),
+        ("Nothing stands out; score 7", 7),
+        ("The model gave a score of 40 earlier; final assessment score: 70", 70),
+        ("Risk score of 20 then score: 85", 85),
+    ])
+    def test_bare_score_takes_first_in_range(self, text, expected):
+        result = parse_model_response(text, "banking", {})
+        assert result["fraud_score"] == expected
+        assert result["score_parsed"] is True
+
+    def test_score_is_clamped(self):
+        result = parse_model_response('{"fraud_score": 140}', "banking", {})
+        assert result["fraud_score"] == 100
+        assert result["risk_level"] == "CRITICAL"
+
+
+class TestParseModelResponses:
+    TEXTS = [
+        '{"fraud_score": 12, "reasoning": "Routine purchase from a long-standing customer account."}',
+        "FRAUD_SCORE: 9",
+        "",
+        '{"clinical_legitimacy_score": 64, "reasoning": "Plausible.", "risk_factors": []}',
+    ]
+
+    @pytest.mark.parametrize("is_clinical_stage", [False, True])
+    def test_matches_single_parse(self, is_clinical_stage):
+        batch = parse_model_responses(self.TEXTS, "medical", {}, is_clinical_stage=is_clinical_stage)
+        assert batch == [
+            parse_model_response(t, "medical", {}, is_clinical_stage=is_clinical_stage) for t in self.TEXTS
+        ]
+
+    def test_empty_batch(self):
+        assert parse_model_responses([], "banking", {}) == []
+
+
+class TestFraudResponseComplete:
+    @pytest.mark.parametrize("text, expected", [
+        ("FRAUD_SCORE: 72\nRISK_LEVEL: HIGH\nREASONING: New payee and VPN.\n\nNote:", True),
+        ("FRAUD_SCORE: 72\nRISK_LEVEL: HIGH\nREASONING: New payee and VPN.", False),
+        ("FRAUD_SCORE: 72\nRISK_LEVEL: HIGH\nREASONING:\n\n", False),
+        ("FRAUD_SCORE: 72\nREASONING: New payee.\n\n", False),
+        ("RISK_LEVEL: HIGH\nREASONING: New payee.\n\n", False),
+    ])
+    def test_requires_all_fields_and_finished_reasoning(self, text, expected):
+        assert fraud_response_complete(text) is expected
+
+
+class TestParseClinicalResponse:
+    def test_json(self):
+        text = '{"clinical_legitimacy_score": 88, "reasoning": "Codes align.", "risk_factors": []}'
+        result = parse_model_response(text, "medical", {}, is_clinical_stage=True)
+        assert result["clinical_legitimacy_score"] == 88
+
+    def test_percentage_skips_out_of_range_values(self):
+        text = "Billed 250% above the regional median, but legitimacy is 80 out of 100."
+        result = parse_model_response(text, "medical", {}, is_clinical_stage=True)
+        assert result["clinical_legitimacy_score"] == 80
+
+    @pytest.mark.parametrize("text,expected", [
+        ("The procedure is highly appropriate for the diagnosis.", 85),
+        ("The procedure is generally appropriate for the diagnosis.", 70),
+        ("The procedure looks appropriate for the diagnosis.", 75),
+        ("The procedure is definitely incompatible here.", 15),
+        ("The procedure is definitely inappropriate here.", 15),
+        ("The pairing is possibly concerning.", 40),
+        ("There is a red flag in this claim.", 30),
+        ("Documentation is insufficient to judge.", 25),
+        ("The procedure was appropriately ordered.", 75),
+        ("Findings are normally seen with this diagnosis.", 75),
+        ("This pairing is typically billed together.", 75),
+        ("The charge is reasonably justified.", 75),
+        ("The claim is unusually large for this visit.", 30),
+        ("The code was inappropriately billed.", 30),
+        ("No opinion.", 50),
+    ])
+    def test_sentiment_fallback(self, text, expected):
+        result = parse_model_response(text, "medical", {}, is_clinical_stage=True)
+        assert result["clinical_legitimacy_score"] == expected
+
+
+class TestCleanReasoning:
+    def test_strips_template_lines_and_code(self):
+        text = (
+            "FRAUD_SCORE: 80 RISK_LEVEL: HIGH The seller account is new and the listing price "
+            "is far below market value, which is consistent with counterfeit goods `grep x` schemes"
+        )
+        cleaned = clean_reasoning(text)
+        assert "FRAUD_SCORE" not in cleaned
+        assert "`" not in cleaned
+        assert cleaned.endswith(".")
+
+    def test_short_text_gets_default(self):
+        assert clean_reasoning("Too short").startswith("This transaction exhibits fraud risk")
+
+    @pytest.mark.parametrize("text", [
+        "REASONING: The account was opened 3 days ago, KYC is unverified and the destination is a "
+        "sanctioned jurisdiction. These factors combined indicate critical risk.",
+        "Analysis: The seller is new | grep 'seller' and prices are 70% below market, suggesting counterfeit goods.",
+        "The supplier requested advance payment.\n```python\nimport os\nprint(score)\n```\nMissing documentation "
+        "and a 35% price variance point to a kickback scheme.",
+        "Price inflation of 40% is consistent with invoice padding # see audit trail\nand duplicated freight charges "
+        "on the purchase order, which is a common supply-chain fraud typology.",
+        "Claim shows upcoding: the 99215 visit is not supported by the `note` text and the provider was "
+        "previously flagged for similar billing patterns in 2023.",
+        "FRAUD_SCORE: 72\nRISK_LEVEL: HIGH\nRISK_FACTORS: new account, VPN\nReasoning: Velocity is high "
+        "and the device fingerprint is new for this customer account.'",
+        "Code: ```def score(x): return 1```",
+        "short",
+        "Merchant category mismatch ```sh\necho `id` | grep 'x'\n```` and a refund to an unverified card "
+        "shortly after purchase indicate card-testing | awk 'unterminated",
+    ])
+    def test_fast_path_matches_reference_chain(self, text):
+        assert _clean_reasoning_fast(text) == _clean_reasoning_slow(text)
@@ -0,0 +1,51 @@
+"""Unit tests for the Pinecone preload script."""
+import pytest
+
+from app.core.rag_engine import RAGEngine
+from scripts import preload_pinecone
+
+PATTERNS = {"banking": [{"description": "a", "risk_level": "high", "indicators": []}]}
+PATTERN_ID = RAGEngine.pattern_vector_id("banking", PATTERNS["banking"][0])
+
+
+@pytest.fixture
+def index(monkeypatch):
+    """Run main() against a stubbed engine whose namespace is the returned set of IDs."""
+    ids = set()
+
+    def upsert_all_patterns(self, patterns, skip_ids=frozenset(), **kwargs):
+        new = {RAGEngine.pattern_vector_id(s, p) for s, ps in patterns.items() for p in ps} - skip_ids
+        ids.update(new)
+        return len(new)
+
+    def delete_vectors(self, stale):
+        ids.difference_update(stale)
+        return len(stale)
+
+    monkeypatch.setenv("PINECONE_API_KEY", "test-key")
+    monkeypatch.setattr(preload_pinecone, "EMBEDDING_CACHE_PATH", "")
+    monkeypatch.setattr(preload_pinecone, "get_comprehensive_patterns", lambda: PATTERNS)
+    monkeypatch.setattr(RAGEngine, "initialize", lambda self: None)
+    monkeypatch.setattr(RAGEngine, "existing_vector_ids", lambda self, prefix="", candidate_ids=None: set(ids))
+    monkeypatch.setattr(RAGEngine, "upsert_all_patterns", upsert_all_patterns)
+    monkeypatch.setattr(RAGEngine, "delete_vectors", delete_vectors)
+    monkeypatch.setattr(RAGEngine, "wait_for_count", lambda self, expected, **kwargs: len(ids))
+    return ids
+
+
+class TestPreload:
+    def test_stale_vectors_are_deleted_after_upsert(self, index):
+        index.update({"banking_0_12345", "banking_1_67890"})
+        preload_pinecone.main([])
+        assert index == {PATTERN_ID}
+
+    def test_failed_upsert_deletes_nothing(self, index, monkeypatch):
+        index.add("banking_0_12345")
+
+        def fail(self, *args, **kwargs):
+            raise RuntimeError("upsert failed")
+
+        monkeypatch.setattr(RAGEngine, "upsert_all_patterns", fail)
+        with pytest.raises(SystemExit):
+            preload_pinecone.main([])
+        assert index == {"banking_0_12345"}
@@ -0,0 +1,32 @@
+"""Unit tests for sector prompt builders."""
+import pytest
+
+from app.llm.prompts import build_prompt
+
+
+class TestSectorPrompts:
+    @pytest.mark.parametrize("sector", ["banking", "medical", "ecommerce", "supply_chain"])
+    def test_no_unfilled_placeholders(self, sector):
+        prompt = build_prompt(sector, {})
+        assert "FRAUD_SCORE:" in prompt
+        assert "{" not in prompt and "}" not in prompt
+
+    def test_missing_fields_keep_their_defaults(self):
+        prompt = build_prompt("banking", {"amount": 2500})
+        assert "- Amount: $2500" in prompt
+        assert "- Transaction ID: None" in prompt
+        assert "- IP Address: N/A" in prompt
+
+    def test_braces_in_values_are_not_reformatted(self):
+        prompt = build_prompt("supply_chain", {"supplier_name": "{order_amount} Ltd"})
+        assert "- Supplier Name: {order_amount} Ltd" in prompt
+
+    def test_computed_sections_take_precedence_over_data(self):
+        prompt = build_prompt("banking", {"wallet_info": "injected"}, rag_context="Mule account pattern")
+        assert "injected" not in prompt
+        assert "CONTEXT FROM SIMILAR FRAUD PATTERNS:\nMule account pattern" in prompt
+
+    def test_ecommerce_price_falls_back_to_amount(self):
+        prompt = build_prompt("ecommerce", {"amount": 40})
+        assert "- Listed Price: $40" in prompt
+        assert "- Order Amount: $40" in prompt
@@ -4,6 +4,29 @@ from unittest.mock import Mock, patch
 from app.core.rag_engine import RAGEngine
 
 
+def _hf_batch(texts):
+    """generate_batch_with_sources stand-in: one HF vector per text."""
+    return [[0.1] for _ in texts], ["hf"] * len(texts)
+
+
+@pytest.fixture
+def initialized_rag(monkeypatch):
+    """RAGEngine initialized against a mocked Pinecone client; rag.index is the mock index."""
+    mock_index = Mock()
+    mock_index.describe_index_stats.return_value = {
+        'total_vector_count': 100,
+        'namespaces': {'rag': {'vector_count': 50}},
+        'dimension': 384
+    }
+    mock_pc = Mock()
+    mock_pc.Index.return_value = mock_index
+    monkeypatch.setenv('PINECONE_API_KEY', 'test-key')
+    monkeypatch.setattr('app.core.rag_engine.Pinecone', Mock(return_value=mock_pc))
+    rag = RAGEngine()
+    rag.initialize()
+    return rag
+
+
 class TestRAGEngine:
     def test_init_without_api_key(self):
         with patch.dict('os.environ', {}, clear=True):
@@ -26,44 +49,184 @@ class TestRAGEngine:
         count = rag.get_collection_count()
         assert count == 0
     
-    @patch('app.core.rag_engine.Pinecone')
-    def test_initialize_success(self, mock_pinecone):
-        mock_index = Mock()
-        mock_index.describe_index_stats.return_value = {
-            'total_vector_count': 100,
-            'namespaces': {'rag': {'vector_count': 50}},
-            'dimension': 384
-        }
-        mock_pc = Mock()
-        mock_pc.Index.return_value = mock_index
-        mock_pinecone.return_value = mock_pc
-        
-        with patch.dict('os.environ', {'PINECONE_API_KEY': 'test-key'}):
-            rag = RAGEngine()
-            rag.initialize()
-            assert rag.initialized is True
-    
-    @patch('app.core.rag_engine.Pinecone')
-    def test_query_similar_patterns_success(self, mock_pinecone):
-        mock_index = Mock()
-        mock_index.describe_index_stats.return_value = {
-            'namespaces': {'rag': {'vector_count': 50}}
-        }
-        mock_pc = Mock()
-        mock_pc.Index.return_value = mock_index
-        mock_pinecone.return_value = mock_pc
-        
-        with patch.dict('os.environ', {'PINECONE_API_KEY': 'test-key'}):
-            with patch('app.core.rag_engine.query_similar_patterns') as mock_query:
-                mock_query.return_value = {
-                    "context": "test context",
-                    "count": 3,
-                    "patterns": []
-                }
-                
-                rag = RAGEngine()
-                rag.initialize()
-                result = rag.query_similar_patterns("banking", "test query")
-                
-                assert result["count"] == 3
-                assert result["context"] == "test context"
+    def test_initialize_success(self, initialized_rag):
+        assert initialized_rag.initialized is True
+        assert initialized_rag.index is not None
+
+    def test_query_similar_patterns_success(self, initialized_rag):
+        with patch('app.core.rag_engine.query_similar_patterns') as mock_query:
+            mock_query.return_value = {
+                "context": "test context",
+                "count": 3,
+                "patterns": []
+            }
+            result = initialized_rag.query_similar_patterns("banking", "test query")
+
+        assert result["count"] == 3
+        assert result["context"] == "test context"
+
+    def test_embed_patterns_uses_one_batch_across_sectors(self):
+        rag = RAGEngine()
+        rag._embedding_generator = Mock()
+        rag._embedding_generator.generate_batch_with_sources.side_effect = lambda texts: (
+            [[float(len(t))] for t in texts], ["hf"] * len(texts)
+        )
+        embeddings = rag.embed_patterns({
+            "banking": [{"description": "a"}, {"description": "bb"}],
+            "medical": [{"description": "ccc"}],
+        })
+        rag._embedding_generator.generate_batch_with_sources.assert_called_once_with(["a", "bb", "ccc"])
+        assert embeddings == {"banking": [[1.0], [2.0]], "medical": [[3.0]]}
+
+    def test_upsert_patterns_uses_precomputed_embeddings(self, initialized_rag):
+        rag = initialized_rag
+        rag._embedding_generator = Mock()
+        rag.upsert_patterns([{"description": "a"}], "banking", embeddings=[[0.5]])
+        rag._embedding_generator.generate_batch_with_sources.assert_not_called()
+        vectors = rag.index.upsert.call_args.kwargs["vectors"]
+        assert vectors[0]["values"] == [0.5]
+
+    def test_hash_fallback_embeddings_abort_the_upsert(self, initialized_rag):
+        rag = initialized_rag
+        rag._embedding_generator = Mock()
+        rag._embedding_generator.generate_batch_with_sources.return_value = ([[0.1], [0.2]], ["hf", "hash"])
+        with pytest.raises(RuntimeError, match="hash vectors"):
+            rag.upsert_all_patterns({"banking": [{"description": "a"}, {"description": "b"}]})
+        rag.index.upsert.assert_not_called()
+
+    def test_upsert_batches_are_sent_concurrently(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        monkeypatch.setattr(rag_module, "UPSERT_BATCH_SIZE", 1)
+        rag = initialized_rag
+        patterns = [{"description": d} for d in ("a", "b", "c")]
+        rag.upsert_patterns(patterns, "banking", embeddings=[[0.1], [0.2], [0.3]])
+        assert rag.index.upsert.call_count == 3
+        sent = sorted(call.kwargs["vectors"][0]["values"][0] for call in rag.index.upsert.call_args_list)
+        assert sent == [0.1, 0.2, 0.3]
+
+    def test_failed_upsert_batch_is_raised(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        monkeypatch.setattr(rag_module, "UPSERT_BATCH_SIZE", 1)
+        rag = initialized_rag
+        rag.index.upsert.side_effect = [None, RuntimeError("429")]
+        with pytest.raises(RuntimeError):
+            rag.upsert_patterns([{"description": "a"}, {"description": "b"}], "banking", embeddings=[[0.1], [0.2]])
+
+    def test_upsert_all_patterns_fills_batches_across_sectors(self, initialized_rag):
+        rag = initialized_rag
+        rag._embedding_generator = Mock()
+        rag._embedding_generator.generate_batch_with_sources.side_effect = _hf_batch
+        count = rag.upsert_all_patterns({
+            "banking": [{"description": "a"}, {"description": "b"}],
+            "medical": [{"description": "c"}],
+        })
+        assert count == 3
+        rag.index.upsert.assert_called_once()
+        sectors = [v["metadata"]["sector"] for v in rag.index.upsert.call_args.kwargs["vectors"]]
+        assert sectors == ["banking", "banking", "medical"]
+
+    def test_wait_for_count_backs_off_until_expected(self, monkeypatch):
+        import app.core.rag_engine as rag_module
+        sleeps = []
+        monkeypatch.setattr(rag_module.time, "sleep", sleeps.append)
+        rag = RAGEngine()
+        counts = iter([0, 40, 66])
+        monkeypatch.setattr(RAGEngine, "get_collection_count", lambda self: next(counts))
+        assert rag.wait_for_count(66) == 66
+        assert sleeps == [0.5, 0.75]
+
+    def test_wait_for_count_gives_up_at_timeout(self, monkeypatch):
+        rag = RAGEngine()
+        monkeypatch.setattr(RAGEngine, "get_collection_count", lambda self: 10)
+        assert rag.wait_for_count(66, timeout=0.0) == 10
+
+    def test_pattern_vector_ids_are_stable_and_content_derived(self):
+        pattern = {"description": "a", "risk_level": "high", "indicators": ["x"]}
+        assert RAGEngine.pattern_vector_id("banking", pattern) == RAGEngine.pattern_vector_id("banking", dict(pattern))
+        assert RAGEngine.pattern_vector_id("banking", pattern) != RAGEngine.pattern_vector_id(
+            "banking", {**pattern, "risk_level": "low"}
+        )
+
+    def test_upsert_all_patterns_skips_existing_ids(self, initialized_rag):
+        rag = initialized_rag
+        rag._embedding_generator = Mock()
+        rag._embedding_generator.generate_batch_with_sources.side_effect = _hf_batch
+        patterns = {"banking": [{"description": "a"}, {"description": "b"}]}
+        skip = {RAGEngine.pattern_vector_id("banking", patterns["banking"][0])}
+        assert rag.upsert_all_patterns(patterns, skip_ids=skip) == 1
+        rag._embedding_generator.generate_batch_with_sources.assert_called_once_with(["b"])
+        sent = [v["id"] for v in rag.index.upsert.call_args.kwargs["vectors"]]
+        assert sent == [RAGEngine.pattern_vector_id("banking", patterns["banking"][1])]
+
+    def test_existing_vector_ids_collects_every_page(self, initialized_rag):
+        rag = initialized_rag
+        page = Mock(vectors=[Mock(id="banking_b")])
+        rag.index.list.return_value = iter([["banking_a"], page])
+        assert rag.existing_vector_ids() == {"banking_a", "banking_b"}
+
+    def test_existing_vector_ids_soft_fails_when_listing_unsupported(self, initialized_rag):
+        rag = initialized_rag
+        rag.index.list.side_effect = RuntimeError("list is not supported for pod-based indexes")
+        assert rag.existing_vector_ids() == set()
+
+    def test_existing_vector_ids_falls_back_to_fetch_for_candidates(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        monkeypatch.setattr(rag_module, "FETCH_BATCH_SIZE", 2)
+        rag = initialized_rag
+        rag.index.list.side_effect = RuntimeError("list is not supported for pod-based indexes")
+        rag.index.fetch.side_effect = [Mock(vectors={"banking_a": Mock()}), Mock(vectors={"medical_c": Mock()})]
+        found = rag.existing_vector_ids(candidate_ids=["banking_a", "banking_b", "medical_c"])
+        assert found == {"banking_a", "medical_c"}
+        assert rag.index.fetch.call_count == 2
+
+    def test_delete_vectors_is_batched(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        monkeypatch.setattr(rag_module, "DELETE_BATCH_SIZE", 2)
+        rag = initialized_rag
+        assert rag.delete_vectors({"c", "a", "b"}) == 3
+        deleted = [call.kwargs["ids"] for call in rag.index.delete.call_args_list]
+        assert deleted == [["a", "b"], ["c"]]
+        assert all(call.kwargs["namespace"] == "rag" for call in rag.index.delete.call_args_list)
+
+    def test_upsert_all_patterns_honours_batch_size(self, initialized_rag):
+        rag = initialized_rag
+        rag._embedding_generator = Mock()
+        rag._embedding_generator.generate_batch_with_sources.side_effect = _hf_batch
+        patterns = {"banking": [{"description": d} for d in "abcde"]}
+        rag.upsert_all_patterns(patterns, batch_size=2, concurrency=1)
+        sizes = [len(call.kwargs["vectors"]) for call in rag.index.upsert.call_args_list]
+        assert sizes == [2, 2, 1]
+
+    def test_throttled_batch_is_retried_as_halves(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        sleeps = []
+        monkeypatch.setattr(rag_module.time, "sleep", sleeps.append)
+        rag = initialized_rag
+        throttled = RuntimeError("Too Many Requests")
+        throttled.status_code = 429
+        rag.index.upsert.side_effect = [throttled, None, None]
+        vectors = [{"id": v, "values": [0.1]} for v in ("a", "b", "c", "d")]
+        rag._upsert_vectors(vectors, concurrency=1)
+        sent = [[v["id"] for v in call.kwargs["vectors"]] for call in rag.index.upsert.call_args_list]
+        assert sent == [["a", "b", "c", "d"], ["a", "b"], ["c", "d"]]
+        assert len(sleeps) == 1
+
+    def test_non_retryable_upsert_error_is_not_retried(self, initialized_rag):
+        rag = initialized_rag
+        bad_request = RuntimeError("Bad Request")
+        bad_request.status = 400
+        rag.index.upsert.side_effect = bad_request
+        with pytest.raises(RuntimeError):
+            rag._upsert_vectors([{"id": "a", "values": [0.1]}], concurrency=1)
+        assert rag.index.upsert.call_count == 1
+
+    def test_upsert_gives_up_after_max_retries(self, monkeypatch, initialized_rag):
+        import app.core.rag_engine as rag_module
+        monkeypatch.setattr(rag_module.time, "sleep", lambda _: None)
+        rag = initialized_rag
+        unavailable = RuntimeError("Service Unavailable")
+        unavailable.status_code = 503
+        rag.index.upsert.side_effect = unavailable
+        with pytest.raises(RuntimeError):
+            rag._upsert_vectors([{"id": "a", "values": [0.1]}], concurrency=1)
+        assert rag.index.upsert.call_count == rag_module.UPSERT_MAX_RETRIES + 1
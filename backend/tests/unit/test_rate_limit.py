@@ -0,0 +1,80 @@
+"""Unit tests for the per-provider token bucket and circuit breaker."""
+import threading
+
+import pytest
+
+from app.llm.rate_limit import CircuitBreaker, TokenBucket
+
+
+class TestTokenBucket:
+    def test_burst_then_times_out(self):
+        bucket = TokenBucket(rate=0.5, capacity=2)
+        assert bucket.acquire(timeout=0)
+        assert bucket.acquire(timeout=0)
+        assert not bucket.acquire(timeout=0.01)
+
+    def test_refills_over_time(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        assert bucket.acquire(timeout=0)
+        assert bucket.acquire(timeout=0.5)
+
+    @pytest.mark.parametrize("hits, expected", [(1, 2.0), (2, 1.0), (10, 0.1)])
+    def test_rate_halves_on_429_down_to_floor(self, hits, expected):
+        bucket = TokenBucket(rate=4, capacity=1, min_rate=0.1)
+        for _ in range(hits):
+            bucket.record_rate_limited()
+        assert bucket.rate == pytest.approx(expected)
+
+    def test_rate_recovers_additively_up_to_max(self):
+        bucket = TokenBucket(rate=2, capacity=1, increase_every=3, increase_step=0.5)
+        bucket.record_rate_limited()
+        for _ in range(3):
+            bucket.record_success()
+        assert bucket.rate == pytest.approx(1.5)
+        for _ in range(30):
+            bucket.record_success()
+        assert bucket.rate == pytest.approx(2.0)
+
+    def test_concurrent_acquires_never_exceed_capacity(self):
+        bucket = TokenBucket(rate=0.01, capacity=5)
+        granted = []
+        threads = [
+            threading.Thread(target=lambda: granted.append(bucket.acquire(timeout=0.05)))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert granted.count(True) == 5
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, cooldown_seconds=60)
+        assert [breaker.record_failure() for _ in range(3)] == [False, False, True]
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.parametrize("trial_succeeds, expected", [
+        (True, CircuitBreaker.CLOSED),
+        (False, CircuitBreaker.OPEN),
+    ])
+    def test_half_open_trial_after_cooldown(self, trial_succeeds, expected):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow()  # only one trial in flight
+        if trial_succeeds:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        assert breaker.state == expected
@@ -0,0 +1,55 @@
+"""Unit tests for the opt-in semantic LLM result cache."""
+from app.llm.semantic_cache import SemanticResponseCache
+
+
+class FakeEmbedder:
+    """Maps known prompts to fixed vectors; anything else is a hash fallback."""
+
+    VECTORS = {
+        "wire 2500 to new payee": [1.0, 0.0, 0.0],
+        "wire 2510 to new payee": [0.99, 0.05, 0.0],
+        "refund to unverified card": [0.0, 1.0, 0.0],
+    }
+
+    def generate_with_source(self, text):
+        if text in self.VECTORS:
+            return list(self.VECTORS[text]), "hf"
+        return [0.5, 0.5, 0.5], "hash"
+
+
+RESULT = {"fraud_score": 71, "risk_factors": ["New payee"], "score_parsed": True}
+
+
+class TestSemanticResponseCache:
+    def test_near_duplicate_prompt_hits(self):
+        cache = SemanticResponseCache(threshold=0.95, embedder=FakeEmbedder())
+        cache.store("banking", "wire 2500 to new payee", RESULT)
+        assert cache.lookup("banking", "wire 2510 to new payee") == RESULT
+
+    def test_dissimilar_prompt_misses(self):
+        cache = SemanticResponseCache(threshold=0.95, embedder=FakeEmbedder())
+        cache.store("banking", "wire 2500 to new payee", RESULT)
+        assert cache.lookup("banking", "refund to unverified card") is None
+
+    def test_sectors_are_isolated(self):
+        cache = SemanticResponseCache(threshold=0.95, embedder=FakeEmbedder())
+        cache.store("banking", "wire 2500 to new payee", RESULT)
+        assert cache.lookup("ecommerce", "wire 2500 to new payee") is None
+
+    def test_hash_fallback_embeddings_are_ignored(self):
+        cache = SemanticResponseCache(threshold=0.95, embedder=FakeEmbedder())
+        cache.store("banking", "unknown prompt", RESULT)
+        assert cache.lookup("banking", "unknown prompt") is None
+
+    def test_oldest_entries_evicted(self):
+        cache = SemanticResponseCache(threshold=0.95, max_entries=1, embedder=FakeEmbedder())
+        cache.store("banking", "wire 2500 to new payee", RESULT)
+        cache.store("banking", "refund to unverified card", {**RESULT, "fraud_score": 40})
+        assert cache.lookup("banking", "wire 2500 to new payee") is None
+        assert cache.lookup("banking", "refund to unverified card")["fraud_score"] == 40
+
+    def test_returned_result_is_a_copy(self):
+        cache = SemanticResponseCache(threshold=0.95, embedder=FakeEmbedder())
+        cache.store("banking", "wire 2500 to new payee", RESULT)
+        cache.lookup("banking", "wire 2500 to new payee")["risk_factors"].append("mutated")
+        assert cache.lookup("banking", "wire 2500 to new payee")["risk_factors"] == ["New payee"]
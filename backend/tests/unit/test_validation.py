@@ -4,25 +4,14 @@ from app.core.validation import get_risk_level, validate_llm_result
 
 
 class TestGetRiskLevel:
-    def test_critical_risk(self):
-        assert get_risk_level(85) == "critical"
-        assert get_risk_level(90) == "critical"
-        assert get_risk_level(100) == "critical"
-    
-    def test_high_risk(self):
-        assert get_risk_level(60) == "high"
-        assert get_risk_level(70) == "high"
-        assert get_risk_level(84) == "high"
-    
-    def test_medium_risk(self):
-        assert get_risk_level(30) == "medium"
-        assert get_risk_level(45) == "medium"
-        assert get_risk_level(59) == "medium"
-    
-    def test_low_risk(self):
-        assert get_risk_level(0) == "low"
-        assert get_risk_level(15) == "low"
-        assert get_risk_level(29) == "low"
+    @pytest.mark.parametrize("score,expected", [
+        (85, "critical"), (90, "critical"), (100, "critical"),
+        (60, "high"), (70, "high"), (84, "high"),
+        (30, "medium"), (45, "medium"), (59, "medium"),
+        (0, "low"), (15, "low"), (29, "low"), (float("nan"), "low"),
+    ])
+    def test_risk_level(self, score, expected):
+        assert get_risk_level(score) == expected
 
 
 class TestValidateLLMResult:
@@ -2,40 +2,97 @@ import base64
 import json
 import os
 import requests
+import google.auth
 from google.auth.transport.requests import Request
 from google.oauth2 import service_account
 import logging
 
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import google.cloud.logging as cloud_logging
+except ImportError:
+    cloud_logging = None
+
+
+def _setup_logging():
+    """Structured Cloud Logging on GCP (extra json_fields become jsonPayload); plain stderr elsewhere."""
+    if cloud_logging is not None and os.environ.get('K_SERVICE'):
+        try:
+            cloud_logging.Client().setup_logging(log_level=logging.INFO)
+            return
+        except Exception:
+            pass
+    logging.basicConfig(level=logging.INFO)
+
+_setup_logging()
 logger = logging.getLogger(__name__)
 
 PROJECT_ID = os.environ.get('PROJECT_ID')
 REGION = os.environ.get('REGION')
 BACKEND_SERVICE = os.environ.get('BACKEND_SERVICE')
 
+# alertThresholdExceeded fractions: delete the backend at 100%, warn from 90%
+_SHUTDOWN_THRESHOLD = 1.0
+_WARN_THRESHOLD = 0.9
+
+# Warm instances keep module globals: reuse the ADC credentials (refreshed
+# only when the token is missing or expired) and the HTTPS connection pool
+_SESSION = requests.Session()
+_credentials = None
+
+def _get_access_token():
+    """Return a valid ADC access token, resolving and refreshing credentials only when needed."""
+    global _credentials
+    if _credentials is None:
+        _credentials, _ = google.auth.default()
+    if not _credentials.valid:
+        # Same session as the DELETE: token refresh and API call share one pool
+        _credentials.refresh(Request(session=_SESSION))
+    return _credentials.token
+
 def process_budget_alert(data, context):
     """Triggered by Pub/Sub when budget alert fires."""
     try:
         if 'data' in data:
-            pubsub_message = base64.b64decode(data['data']).decode('utf-8')
+            pubsub_message = base64.b64decode(data['data'])
         else:
             logger.error("No data in Pub/Sub message")
             return
+
+        # Routine cost updates (several per day) carry no alertThresholdExceeded
+        # field and can never trigger a shutdown; skip parsing them entirely
+        if b'"alertThresholdExceeded"' not in pubsub_message:
+            logger.info("📊 Budget update without a crossed threshold; no action needed")
+            return
+
+        # orjson parses the decoded bytes directly (json needs a str)
+        if orjson is not None:
+            budget_data = orjson.loads(pubsub_message)
+        else:
+            budget_data = json.loads(pubsub_message.decode('utf-8'))
         
-        budget_data = json.loads(pubsub_message)
-        logger.info(f"Budget alert received: {json.dumps(budget_data, indent=2)}")
-        
+        # Coerce: a hand-published test message may carry strings, and a
+        # TypeError here would silently skip the shutdown
         cost_amount = float(budget_data.get('costAmount', 0))
         budget_amount = float(budget_data.get('budgetAmount', 0))
         threshold_percent = float(budget_data.get('alertThresholdExceeded', 0))
         
-        logger.info(f"Cost: ${cost_amount}, Budget: ${budget_amount}, Threshold: {threshold_percent}")
+        # One compact line; the full payload rides along as indexed JSON fields
+        logger.info(
+            "Budget alert received: cost=%s budget=%s threshold=%s",
+            cost_amount, budget_amount, threshold_percent,
+            extra={"json_fields": budget_data},
+        )
         
-        if threshold_percent >= 1.0:
+        if threshold_percent >= _SHUTDOWN_THRESHOLD:
             logger.warning(f"🚨 BUDGET LIMIT REACHED! Initiating shutdown...")
             shutdown_backend_service()
             logger.info("✅ Backend service shutdown complete")
-        elif threshold_percent >= 0.9:
+        elif threshold_percent >= _WARN_THRESHOLD:
             logger.warning(f"⚠️ Budget at 90% - approaching shutdown threshold")
         else:
             logger.info(f"📊 Budget update: {threshold_percent * 100}% used")
@@ -47,11 +104,7 @@ def shutdown_backend_service():
     """Delete the backend service using REST API."""
     try:
         # Use Application Default Credentials
-        import google.auth
-        
-        credentials, project = google.auth.default()
-        credentials.refresh(Request())
-        access_token = credentials.token
+        access_token = _get_access_token()
         
         # REST API endpoint
         url = f"https://{REGION}-run.googleapis.com/v2/projects/{PROJECT_ID}/locations/{REGION}/services/{BACKEND_SERVICE}"
@@ -63,7 +116,7 @@ def shutdown_backend_service():
         
         logger.info(f"Deleting service via REST API: {url}")
         
-        response = requests.delete(url, headers=headers, timeout=30)
+        response = _SESSION.delete(url, headers=headers, timeout=30)
         
         if response.status_code in [200, 202, 204]:
             logger.info(f"✅ Service deletion initiated successfully")